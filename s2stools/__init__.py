@@ -1,3 +1,3 @@
-from . import clim, events, process, plot, indices, utils, compute, download
+from . import cache, clim, events, process, plot, indices, utils, compute, download
 
 __version__ = "0.4.1"
@@ -0,0 +1,263 @@
+import functools
+import hashlib
+import json
+import os
+import time
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import xarray as xr
+
+OPTIONS = dict(
+    cache_dir=os.environ.get(
+        "S2STOOLS_CACHE_DIR",
+        os.path.join(
+            os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+            "s2stools",
+        ),
+    ),
+    ttl=24 * 60 * 60,
+    offline=os.environ.get("S2STOOLS_OFFLINE", "").lower() in ("1", "true", "yes"),
+    mirror=os.environ.get("S2STOOLS_MIRROR") or None,
+)
+"""
+Options of the download cache, see :class:`set_options`.
+"""
+
+
+class set_options:
+    """
+    Set options for downloads of indices and event catalogues, globally or within a ``with`` block.
+
+    Parameters
+    ----------
+    cache_dir : str
+        directory where parsed downloads are stored as netCDF, None disables the cache.
+        Defaults to ``$S2STOOLS_CACHE_DIR`` or ``~/.cache/s2stools``.
+    ttl : float
+        time in seconds after which cached results are downloaded again, None to never expire. Defaults to one day.
+    offline : bool
+        never access the internet: results come from the cache (even if expired) or the mirror, otherwise a
+        ``ConnectionError`` is raised. Defaults to ``$S2STOOLS_OFFLINE`` or False.
+    mirror : str
+        local directory or base URL (e.g. a local HTTP server) that replaces the original servers. Files are looked
+        up by host and path of the original URL, e.g. ``<mirror>/psl.noaa.gov/gcos_wgsp/Timeseries/Data/...``, the
+        layout created by ``wget -x``. Defaults to ``$S2STOOLS_MIRROR`` or None.
+
+    Examples
+    --------
+    >>> s2stools.cache.set_options(offline=True)
+    >>> with s2stools.cache.set_options(mirror="/data/mirror", cache_dir=None):
+    >>>     enso = s2stools.indices.download_enso()
+    """
+
+    def __init__(self, **kwargs):
+        invalid = set(kwargs) - set(OPTIONS)
+        if invalid:
+            raise ValueError(
+                f"{invalid} are not valid options, choose from {list(OPTIONS)}"
+            )
+        self.old = {k: OPTIONS[k] for k in kwargs}
+        OPTIONS.update(kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        OPTIONS.update(self.old)
+
+
+def _is_url(path):
+    return urllib.parse.urlparse(str(path)).scheme in ("http", "https", "ftp")
+
+
+def resolve_url(url):
+    """
+    Location from where `url` is fetched: the original URL, or the corresponding file or URL in the mirror.
+
+    Parameters
+    ----------
+    url : str
+
+    Returns
+    -------
+    str
+    """
+    mirror = OPTIONS["mirror"]
+    if mirror is None:
+        return url
+    parsed = urllib.parse.urlparse(url)
+    relative = parsed.netloc + parsed.path
+    if _is_url(mirror):
+        return str(mirror).rstrip("/") + "/" + relative
+    return os.path.join(mirror, relative)
+
+
+def _check_online(location):
+    if OPTIONS["offline"] and _is_url(location) and OPTIONS["mirror"] is None:
+        raise ConnectionError(
+            f"s2stools is in offline mode, cannot download {location}. "
+            f"Use s2stools.cache.set_options(mirror=...) or fill the cache first."
+        )
+
+
+def fetch_bytes(url, timeout=None):
+    """
+    Content of `url`, read from the mirror if one is set.
+
+    Parameters
+    ----------
+    url : str
+    timeout : float
+        timeout in seconds for remote requests. Defaults to None.
+
+    Returns
+    -------
+    bytes
+    """
+    location = resolve_url(url)
+    _check_online(location)
+    if not _is_url(location):
+        with open(location, "rb") as f:
+            return f.read()
+    with urllib.request.urlopen(location, timeout=timeout) as response:
+        return response.read()
+
+
+def open_remote_dataset(url):
+    """
+    Open a remote (OPeNDAP) dataset with ``xr.open_dataset``, from the mirror if one is set.
+    In a local mirror directory, the dataset is expected as netCDF file at the mirrored path.
+    """
+    location = resolve_url(url)
+    _check_online(location)
+    return xr.open_dataset(location)
+
+
+def _to_dataset(result):
+    # store any of DataArray, Dataset or list of DataArrays as Dataset, and remember how to restore it
+    if isinstance(result, xr.Dataset):
+        return result, dict(kind="dataset")
+    if isinstance(result, xr.DataArray):
+        name = "__data__" if result.name is None else result.name
+        return result.to_dataset(name=name), dict(kind="dataarray", names=[name])
+    if isinstance(result, (list, tuple)) and all(
+        isinstance(r, xr.DataArray) for r in result
+    ):
+        names = [r.name for r in result]
+        # the DataArrays are aligned by the merge, masks remember their original coordinates
+        masks = {
+            f"__{r.name}_{d}": xr.DataArray(
+                np.ones(r.sizes[d], dtype="int8"), dims=d, coords={d: r[d]}
+            )
+            for r in result
+            for d in r.dims
+            if d in r.coords
+        }
+        ds = xr.merge([*result, xr.Dataset(masks)], join="outer")
+        ds = ds.assign({m: ds[m].fillna(0).astype("int8") for m in masks})
+        return ds, dict(kind="list", names=names)
+    raise TypeError(f"cannot cache results of type {type(result)}")
+
+
+def _from_dataset(ds, meta):
+    if meta["kind"] == "dataset":
+        return ds
+    if meta["kind"] == "dataarray":
+        da = ds[meta["names"][0]]
+        return da.rename(None) if meta["names"][0] == "__data__" else da
+    return [
+        ds[name].isel(
+            {
+                d: ds[f"__{name}_{d}"].values == 1
+                for d in ds[name].dims
+                if f"__{name}_{d}" in ds
+            }
+        )
+        for name in meta["names"]
+    ]
+
+
+def _read(path):
+    with xr.open_dataset(path) as ds:
+        ds = ds.load()
+    meta = json.loads(ds.attrs.pop("s2stools_cache"))
+    return _from_dataset(ds, meta), meta
+
+
+def _write(path, result, source):
+    ds, meta = _to_dataset(result)
+    meta.update(created=time.time(), source=source)
+    ds = ds.assign_attrs(s2stools_cache=json.dumps(meta))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # write to a temporary file first, so that interrupted writes are not picked up
+    tmp = path.with_suffix(".tmp")
+    ds.to_netcdf(tmp)
+    os.replace(tmp, path)
+
+
+def cached(name, source=None, ignore=(), condition=None):
+    """
+    Decorator: store the (parsed) result of a download function on disk as netCDF.
+
+    The cache key consists of `name` and the arguments of the function call. Cached results are returned while
+    they are younger than the ``ttl`` option. If downloading fails (e.g. offline), an expired result is returned
+    with a warning.
+
+    Parameters
+    ----------
+    name : str
+        name of the cache entry
+    source : str
+        URL of the data, stored as metadata. Defaults to None.
+    ignore : list
+        keyword arguments that are not part of the cache key, e.g. timeouts. Defaults to ().
+    condition : callable
+        if given, results are only stored if ``condition(result)`` is True. Defaults to None.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if OPTIONS["cache_dir"] is None:
+                return func(*args, **kwargs)
+            key_kwargs = {k: v for k, v in kwargs.items() if k not in ignore}
+            key = hashlib.sha256(
+                json.dumps([args, key_kwargs], sort_keys=True, default=str).encode()
+            ).hexdigest()[:16]
+            path = Path(OPTIONS["cache_dir"]) / f"{name}_{key}.nc"
+
+            stale = None
+            if path.exists():
+                result, meta = _read(path)
+                age = time.time() - meta["created"]
+                if OPTIONS["offline"] or OPTIONS["ttl"] is None or age < OPTIONS["ttl"]:
+                    return result
+                stale = result
+            try:
+                result = func(*args, **kwargs)
+            except OSError as e:
+                # includes ConnectionError and URLError
+                if stale is None:
+                    raise
+                print(f"Warning: download of {name} failed ({e}), using expired cache")
+                return stale
+            if condition is None or condition(result):
+                _write(path, result, source)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def clear(name=None):
+    """
+    Delete cached results, all or those of `name`.
+    """
+    if OPTIONS["cache_dir"] is None:
+        return
+    for f in Path(OPTIONS["cache_dir"]).glob(f"{name or '*'}_*.nc"):
+        f.unlink()
@@ -1,3 +1,6 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
 import dask.array
 import numpy as np
 import scipy.stats
@@ -331,36 +334,655 @@ def css(forecast_anomalies, observation_anomalies, dim):
     return numerator / denominator
 
 
-def register_sample_variance_aggregation_for_flox():
+VERIFICATION_METRICS = ("css", "acc", "rmse", "mae", "bias", "var_ratio")
+"""Metrics that can be derived by :func:`verify`."""
+
+_VERIFICATION_MOMENTS = (
+    "n",
+    "f",
+    "o",
+    "ff",
+    "oo",
+    "fo",
+    "err",
+    "abs_err",
+    "sq_err",
+    "ff_raw",
+    "oo_raw",
+    "fo_raw",
+)
+
+
+def _verification_moments(f, o, shift_f=0, shift_o=0):
+    # only pairs where both forecast and observation are valid contribute
+    f, o, shift_f, shift_o = np.broadcast_arrays(f, o, shift_f, shift_o)
+    valid = ~(np.isnan(f) | np.isnan(o))
+    f = np.where(valid, f, 0).astype("float64")
+    o = np.where(valid, o, 0).astype("float64")
+    # (co)variances are accumulated from data shifted close to their mean, which avoids cancellation in
+    # E[x²] - E[x]² for fields with a large mean (e.g. geopotential)
+    f_shifted = np.where(valid, f - shift_f, 0)
+    o_shifted = np.where(valid, o - shift_o, 0)
+    err = f - o
+    return np.stack(
+        [
+            valid.astype("float64"),
+            f_shifted,
+            o_shifted,
+            f_shifted * f_shifted,
+            o_shifted * o_shifted,
+            f_shifted * o_shifted,
+            err,
+            np.abs(err),
+            err * err,
+            f * f,
+            o * o,
+            f * o,
+        ],
+        axis=-1,
+    )
+
+
+def _metric_from_moments(moments, metric):
+    # moments are summed over the verification dimension, last axis is the moment axis
+    n, sf, so, sff, soo, sfo, serr, sabs, ssq, sff_raw, soo_raw, sfo_raw = np.moveaxis(
+        moments, -1, 0
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        n = np.where(n > 0, n, np.nan)
+        mean_f, mean_o = sf / n, so / n
+        var_f = np.maximum(sff / n - mean_f**2, 0)
+        var_o = np.maximum(soo / n - mean_o**2, 0)
+        if metric == "css":
+            return sfo_raw / np.sqrt(sff_raw * soo_raw)
+        elif metric == "acc":
+            return (sfo / n - mean_f * mean_o) / np.sqrt(var_f * var_o)
+        elif metric == "rmse":
+            return np.sqrt(ssq / n)
+        elif metric == "mae":
+            return sabs / n
+        elif metric == "bias":
+            return serr / n
+        elif metric == "var_ratio":
+            return var_f / var_o
+    raise ValueError(
+        f"unknown metric '{metric}', must be one of {VERIFICATION_METRICS}"
+    )
+
+
+def _moment_shift(data, dims):
+    # any valid value along dims is close enough to the mean, e.g. the first; 0 where it is missing
+    return data.isel({d: 0 for d in dims if d in data.dims}, drop=True).fillna(0)
+
+
+def _verification_moments_dataarray(forecast, observation, dims=()):
+    dims = [dims] if isinstance(dims, str) else list(dims)
+    return xr.apply_ufunc(
+        _verification_moments,
+        forecast,
+        observation,
+        _moment_shift(forecast, dims),
+        _moment_shift(observation, dims),
+        output_core_dims=[["moment"]],
+        dask="parallelized",
+        output_dtypes=[np.float64],
+        dask_gufunc_kwargs=dict(output_sizes={"moment": len(_VERIFICATION_MOMENTS)}),
+    ).assign_coords(moment=list(_VERIFICATION_MOMENTS))
+
+
+def verify(forecast, observation, dim, metrics=VERIFICATION_METRICS):
+    """
+    Compute several deterministic verification metrics in a single pass over the data.
+
+    The sums of f, o, f², o², f·o and \\|f-o\\| (and the number of valid pairs) are accumulated blockwise in one
+    reduction along ``dim``, so each dask chunk of forecast and observation is read only once, no matter how many
+    metrics are requested. All metrics are then derived from these moments. Variances and covariances are
+    accumulated from data shifted by a value along ``dim``, so they are accurate also for fields with a large mean.
+
+    Available metrics:
+
+    - ``"css"``: correlation skill score of anomalies (uncentered, as in :func:`css`)
+    - ``"acc"``: anomaly correlation coefficient (centered, i.e. Pearson correlation)
+    - ``"rmse"``: root mean squared error
+    - ``"mae"``: mean absolute error
+    - ``"bias"``: mean forecast minus mean observation
+    - ``"var_ratio"``: ratio of forecast variance to observation variance
+
+    Parameters
+    ----------
+    forecast : xr.DataArray
+        Forecast (anomalies), e.g. ``u`` from :func:`s2stools.process.combine_s2s_and_reanalysis`.
+    observation : xr.DataArray
+        Verifying observation (anomalies), e.g. ``u_verif``. Must be broadcastable against ``forecast``.
+    dim : str or list of str
+        Dimension(s) along which to verify, e.g. ``"fc"`` or ``["reftime", "hc_year"]``.
+    metrics : list of str
+        Which metrics to compute. Defaults to all of :data:`VERIFICATION_METRICS`.
+
+    Returns
+    -------
+    xr.Dataset
+        One data variable per metric.
+
+    Examples
+    --------
+    >>> ds = s2stools.process.combine_s2s_and_reanalysis(ds_s2s, ds_era5)
+    >>> scores = verify(ds.u.mean("number"), ds.u_verif, dim="fc", metrics=["acc", "rmse"])
+
+    Notes
+    -----
+    Only pairs where both forecast and observation are valid are taken into account. This differs from
+    :func:`css`, where the three means are computed independently.
+
+    See Also
+    --------
+    :func:`css`
+    """
+    metrics = [metrics] if isinstance(metrics, str) else list(metrics)
+    for m in metrics:
+        if m not in VERIFICATION_METRICS:
+            raise ValueError(
+                f"unknown metric '{m}', must be one of {VERIFICATION_METRICS}"
+            )
+
+    moments = _verification_moments_dataarray(forecast, observation, dim).sum(dim)
+
+    return xr.Dataset(
+        {
+            m: xr.apply_ufunc(
+                _metric_from_moments,
+                moments,
+                kwargs=dict(metric=m),
+                input_core_dims=[["moment"]],
+                dask="parallelized",
+                output_dtypes=[np.float64],
+            )
+            for m in metrics
+        }
+    )
+
+
+def _crps_ensemble(fc, obs, fair=False):
+    # missing members are sorted to the end, m is the number of valid members
+    x = np.sort(fc, axis=-1)
+    m = np.sum(~np.isnan(x), axis=-1)
+    rank = np.arange(1, x.shape[-1] + 1)
+    valid = rank <= m[..., None]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        abs_error = np.where(valid, np.abs(x - obs[..., None]), 0).sum(axis=-1) / m
+        # for sorted members: sum_i sum_j |x_i - x_j| = 2 * sum_i (2i - m - 1) * x_i
+        weights = 2 * rank - m[..., None] - 1
+        spread = 2 * np.where(valid, weights * x, 0).sum(axis=-1)
+        norm = 2 * m * (m - 1) if fair else 2 * m**2
+        crps = abs_error - spread / norm
+
+    undefined = (m < 2) if fair else (m < 1)
+    return np.where(undefined | np.isnan(obs), np.nan, crps)
+
+
+def crps_ensemble(forecast, observation, member_dim="number", fair=False):
+    """
+    Continuous Ranked Probability Score (CRPS) of an ensemble forecast.
+
+    Uses the sorted-ensemble formulation, which needs O(m log m) operations per forecast instead of comparing
+    all m² pairs of members. Missing (NaN) members are ignored, so realtime forecasts and hindcasts with different
+    ensemble sizes can be scored together in one dataset.
+
+    Parameters
+    ----------
+    forecast : xr.DataArray
+        Ensemble forecast with dimension ``member_dim``.
+    observation : xr.DataArray
+        Verifying observation, without ``member_dim``.
+    member_dim : str
+        Name of the ensemble member dimension. Defaults to ``"number"``.
+    fair : bool
+        If True, compute the fair CRPS (Ferro 2014), which does not penalize small ensemble sizes.
+        Defaults to False.
+
+    Returns
+    -------
+    xr.DataArray
+        CRPS for every forecast, i.e. with all dimensions but ``member_dim``.
+
+    Examples
+    --------
+    >>> ds = s2stools.process.combine_s2s_and_reanalysis(ds_s2s, ds_era5)
+    >>> crps = crps_ensemble(ds.u, ds.u_verif, fair=True).mean("fc")
+    """
+    return xr.apply_ufunc(
+        _crps_ensemble,
+        forecast,
+        observation,
+        kwargs=dict(fair=fair),
+        input_core_dims=[[member_dim], []],
+        dask="parallelized",
+        output_dtypes=[np.float64],
+        dask_gufunc_kwargs=dict(allow_rechunk=True),
+    )
+
+
+_SHARED = {}
+
+
+def _set_shared(shared):
+    # pool initializer: large arguments are sent to each worker process once, not with every batch
+    _SHARED.clear()
+    _SHARED.update(shared)
+
+
+def _call_shared(func, batch):
+    return func(batch, **_SHARED)
+
+
+def _map_batches(func, batches, n_workers=None, executor="process", shared=None):
+    # apply func(batch, **shared) to every batch, optionally in a pool of workers (results keep the order of batches)
+    shared = {} if shared is None else shared
+    if not n_workers or n_workers == 1:
+        return [func(b, **shared) for b in batches]
+    if executor == "thread":
+        with ThreadPoolExecutor(max_workers=n_workers) as ex:
+            return list(ex.map(partial(func, **shared), batches))
+    with ProcessPoolExecutor(
+        max_workers=n_workers, initializer=_set_shared, initargs=(shared,)
+    ) as ex:
+        return list(ex.map(partial(_call_shared, func), batches))
+
+
+def _block_bootstrap_indices(rng, n, n_bootstrap, block_size):
+    # circular block bootstrap: consecutive blocks starting at random positions, wrapped around the end
+    n_blocks = int(np.ceil(n / block_size))
+    starts = rng.integers(0, n, size=(n_bootstrap, n_blocks))
+    idx = (starts[..., None] + np.arange(block_size)) % n
+    return idx.reshape(n_bootstrap, n_blocks * block_size)[:, :n]
+
+
+def _bootstrap_metrics_batch(idx, moments, metrics):
+    # resampled moments are sums over the drawn samples, i.e. counts of each sample times its moments
+    n_batch, n = idx.shape
+    counts = np.zeros((n_batch, moments.shape[0]))
+    np.add.at(counts, (np.arange(n_batch)[:, None], idx), 1)
+    resampled = np.tensordot(counts, moments, axes=(1, 0))
+    return np.stack([_metric_from_moments(resampled, m) for m in metrics])
+
+
+def bootstrap_verify(
+    forecast,
+    observation,
+    dim="reftime",
+    reduce_dims=None,
+    metrics=VERIFICATION_METRICS,
+    n_bootstrap=1_000,
+    block_size=1,
+    ci=(0.025, 0.975),
+    seed=None,
+    batch_size=100,
+    n_workers=None,
+    return_samples=False,
+):
+    """
+    Block-bootstrap confidence intervals for the verification metrics of :func:`verify`.
+
+    Blocks of ``block_size`` consecutive entries along ``dim`` (e.g. reftimes) are drawn with replacement to
+    respect autocorrelation. The moments of :func:`verify` are computed once per entry of ``dim``, so each
+    bootstrap replicate only sums these sufficient statistics instead of touching the raw data again.
+    All resampling indices are drawn at once from a seeded generator, which makes the result reproducible
+    and independent of ``batch_size`` and ``n_workers``.
+
+    Parameters
+    ----------
+    forecast : xr.DataArray
+    observation : xr.DataArray
+    dim : str
+        Dimension that is resampled. Defaults to ``"reftime"``.
+    reduce_dims : str or list of str
+        Further dimensions that are summed over within each sample, e.g. ``["hc_year", "number"]``.
+    metrics : list of str
+        See :func:`verify`.
+    n_bootstrap : int
+        Number of bootstrap replicates. Defaults to 1000.
+    block_size : int
+        Number of consecutive entries along ``dim`` per block. Defaults to 1 (ordinary bootstrap).
+    ci : tuple of float
+        Quantiles of the bootstrap distribution to return. Defaults to (0.025, 0.975).
+    seed : int or np.random.Generator
+        Seed for ``np.random.default_rng``.
+    batch_size : int
+        Number of replicates that are evaluated at once, bounds memory usage. Defaults to 100.
+    n_workers : int
+        If larger than 1, evaluate batches in a pool of worker processes.
+    return_samples : bool
+        If True, return all replicates along dimension ``sample`` instead of quantiles. Defaults to False.
+
+    Returns
+    -------
+    xr.Dataset
+        One data variable per metric, with dimension ``quantile`` (or ``sample``).
+
+    Examples
+    --------
+    >>> ds = s2stools.process.combine_s2s_and_reanalysis(ds_s2s, ds_era5, ensfc=False)
+    >>> ci = bootstrap_verify(ds.u.mean("number"), ds.u_verif, dim="reftime", reduce_dims="hc_year", block_size=4, seed=0)
+
+    See Also
+    --------
+    :func:`verify`
+    """
+    metrics = [metrics] if isinstance(metrics, str) else list(metrics)
+    reduce_dims = [reduce_dims] if isinstance(reduce_dims, str) else reduce_dims
+    moments = _verification_moments_dataarray(
+        forecast, observation, [dim] + list(reduce_dims or [])
+    )
+    if reduce_dims is not None:
+        moments = moments.sum(reduce_dims)
+    moments = moments.transpose(dim, ..., "moment")
+    template = moments.isel({dim: 0}, drop=True).isel(moment=0, drop=True)
+    moments_vals = np.asarray(moments.values)
+
+    rng = np.random.default_rng(seed)
+    idx = _block_bootstrap_indices(rng, moments_vals.shape[0], n_bootstrap, block_size)
+    batches = [idx[i : i + batch_size] for i in range(0, n_bootstrap, batch_size)]
+    results = _map_batches(
+        _bootstrap_metrics_batch,
+        batches,
+        n_workers=n_workers,
+        shared=dict(moments=moments_vals, metrics=metrics),
+    )
+    samples = np.concatenate(results, axis=1)  # (metric, sample, ...)
+
+    if return_samples:
+        new_dim, values = "sample", samples
+        new_coord = np.arange(n_bootstrap)
+    else:
+        new_dim, values = "quantile", np.quantile(samples, ci, axis=1)
+        values = np.moveaxis(values, 0, 1)
+        new_coord = np.asarray(ci)
+
+    return xr.Dataset(
+        {
+            m: xr.DataArray(
+                values[k], dims=(new_dim, *template.dims), coords=template.coords
+            ).assign_coords({new_dim: new_coord})
+            for k, m in enumerate(metrics)
+        }
+    )
+
+
+ENSEMBLE_STATS = ("mean", "std", "var", "min", "max", "median", "count")
+"""Statistics that can be computed by :func:`ensemble_stats` (in addition to quantiles)."""
+
+
+def _sorted_quantile(x, n, q):
+    # linear interpolation between order statistics (like np.nanquantile), x is sorted with NaN at the end
+    pos = q * np.maximum(n - 1, 0)
+    lo = np.floor(pos).astype("int64")
+    hi = np.ceil(pos).astype("int64")
+    x_lo = np.take_along_axis(x, lo[..., None], axis=-1)[..., 0]
+    x_hi = np.take_along_axis(x, hi[..., None], axis=-1)[..., 0]
+    return x_lo + (pos - lo) * (x_hi - x_lo)
+
+
+def _ensemble_stats(data, stats, q, ddof=0):
+    x = np.sort(data, axis=-1)
+    n = np.sum(~np.isnan(x), axis=-1)
+    last = np.maximum(n - 1, 0)[..., None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(x, axis=-1) / n
+        var = np.nansum((x - mean[..., None]) ** 2, axis=-1) / (n - ddof)
+    var = np.where(n - ddof > 0, var, np.nan)
+
+    results = []
+    for s in stats:
+        if s == "mean":
+            results.append(mean)
+        elif s == "std":
+            results.append(np.sqrt(var))
+        elif s == "var":
+            results.append(var)
+        elif s == "min":
+            results.append(x[..., 0])
+        elif s == "max":
+            results.append(np.take_along_axis(x, last, axis=-1)[..., 0])
+        elif s == "median":
+            results.append(_sorted_quantile(x, n, 0.5))
+        elif s == "count":
+            results.append(n.astype("float64"))
+    for qi in q:
+        results.append(_sorted_quantile(x, n, qi))
+
+    res = np.stack(results, axis=-1).astype("float64")
+    return np.where((n > 0)[..., None], res, np.nan)
+
+
+def ensemble_stats(data, stats=("mean", "std"), q=(), member_dim="number", ddof=0):
+    """
+    Compute several ensemble statistics in one pass.
+
+    All requested statistics are computed from a single sort of the members, i.e. one ``apply_ufunc`` call and
+    thus one pass over dask chunks, instead of separate calls to ``.mean()``, ``.std()`` and ``.quantile()``.
+    Missing members are ignored.
+
+    Parameters
+    ----------
+    data : xr.DataArray or xr.Dataset
+        Ensemble data with dimension ``member_dim``.
+    stats : list of str
+        Statistics out of :data:`ENSEMBLE_STATS`. Defaults to ``("mean", "std")``.
+    q : list of float
+        Quantiles between 0 and 1, same interpolation as ``np.nanquantile``. Defaults to none.
+    member_dim : str
+        Defaults to ``"number"``.
+    ddof : int
+        Delta degrees of freedom for ``"std"`` and ``"var"``. Defaults to 0.
+
+    Returns
+    -------
+    xr.DataArray or xr.Dataset
+        Data with dimension ``stat`` instead of ``member_dim``. Quantiles are labelled ``"q<quantile>"``,
+        e.g. ``"q0.1"``.
+
+    Examples
+    --------
+    >>> stats = ensemble_stats(ds.u, stats=["mean", "std"], q=[0.1, 0.9])
+    >>> stats.sel(stat="q0.9") - stats.sel(stat="q0.1")
+    """
+    stats = [stats] if isinstance(stats, str) else list(stats)
+    q = list(np.atleast_1d(q))
+    for s in stats:
+        if s not in ENSEMBLE_STATS:
+            raise ValueError(f"unknown stat '{s}', must be one of {ENSEMBLE_STATS}")
+    labels = stats + [f"q{qi:g}" for qi in q]
+
+    return xr.apply_ufunc(
+        _ensemble_stats,
+        data,
+        kwargs=dict(stats=stats, q=q, ddof=ddof),
+        input_core_dims=[[member_dim]],
+        output_core_dims=[["stat"]],
+        dask="parallelized",
+        output_dtypes=[np.float64],
+        dask_gufunc_kwargs=dict(output_sizes={"stat": len(labels)}, allow_rechunk=True),
+    ).assign_coords(stat=labels)
+
+
+def _flox_power_sum(
+    group_idx, array, *, power=1, axis=-1, size=None, fill_value=None, dtype=None
+):
+    import numpy_groupies as npg
+
+    return npg.aggregate_numpy.aggregate(
+        group_idx,
+        np.asarray(array, dtype="float64") ** power,
+        func="nansum",
+        axis=axis,
+        size=size,
+        fill_value=0,
+        dtype="float64",
+    )
+
+
+def _flox_count_valid(
+    group_idx, array, *, axis=-1, size=None, fill_value=None, dtype=None
+):
+    import numpy_groupies as npg
+
+    return npg.aggregate_numpy.aggregate(
+        group_idx,
+        (~np.isnan(array)).astype("float64"),
+        func="sum",
+        axis=axis,
+        size=size,
+        fill_value=0,
+        dtype="float64",
+    )
+
+
+def _flox_count_above(
+    group_idx, array, *, threshold, axis=-1, size=None, fill_value=None, dtype=None
+):
+    import numpy_groupies as npg
+
+    return npg.aggregate_numpy.aggregate(
+        group_idx,
+        (np.asarray(array) > threshold).astype("float64"),
+        func="sum",
+        axis=axis,
+        size=size,
+        fill_value=0,
+        dtype="float64",
+    )
+
+
+def _flox_sample_variance_finalize(s1, s2, n):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (s2 - s1**2 / n) / (n - 1)
+    return np.where(n > 1, var, np.nan)
+
+
+def _flox_skewness_finalize(s1, s2, s3, n):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s1 / n
+        m2 = s2 / n - mean**2
+        m3 = s3 / n - 3 * mean * s2 / n + 2 * mean**3
+        skew = m3 / m2**1.5
+    return np.where(n > 0, skew, np.nan)
+
+
+def _flox_exceedance_count_finalize(count, n):
+    return np.where(n > 0, count, np.nan)
+
+
+def _flox_exceedance_fraction_finalize(count, n):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, count / n, np.nan)
+
+
+def _flox_numpy_from_chunks(group_idx, array, *, chunks, finalize, **kwargs):
+    # without dask, run all chunk reductions on the full array and finalize right away
+    return finalize(*[c(group_idx, array, **kwargs) for c in chunks])
+
+
+def _flox_aggregation(name, chunks, finalize):
+    from flox.aggregations import Aggregation
+
+    return Aggregation(
+        name=name,
+        numpy=partial(_flox_numpy_from_chunks, chunks=chunks, finalize=finalize),
+        chunk=chunks,
+        combine=("sum",) * len(chunks),
+        finalize=finalize,
+        fill_value=0,
+        final_fill_value=np.nan,
+        dtypes=np.float64,
+        final_dtype=np.float64,
+    )
+
+
+def flox_aggregations(thresholds=()):
+    """
+    Custom aggregations for flox that work on NumPy and on chunked dask arrays.
+
+    Each aggregation reduces every chunk to a few sums (``chunk``), adds these up across chunks (``combine``) and
+    only computes the statistic in the end (``finalize``). Therefore, they can be tree-reduced across dask chunks,
+    e.g. when grouping chunked S2S data by leadtime week or reftime month, without rechunking.
+
+    Available aggregations:
+
+    - ``"sample_variance"``: variance with ``ddof=1``
+    - ``"skewness"``: (biased) sample skewness, like ``scipy.stats.skew``
+    - ``"exceedance_count_<threshold>"``: number of values above each threshold
+    - ``"exceedance_fraction_<threshold>"``: fraction of valid values above each threshold
+    - ``"nanmin"``, ``"nanmax"``, ``"nanargmin"``, ``"nanargmax"``: flox' builtin aggregations, for completeness
+
+    Parameters
+    ----------
+    thresholds : list of float
+        Thresholds for which to create exceedance aggregations.
+
+    Returns
+    -------
+    dict
+        Mapping from name to ``flox.aggregations.Aggregation``.
+
+    Examples
+    --------
+    >>> import flox.xarray
+    >>> aggs = flox_aggregations(thresholds=[0])
+    >>> week = (data.leadtime.dt.days // 7).rename("week")
+    >>> flox.xarray.xarray_reduce(data, week, func=aggs["skewness"])
+    >>> flox.xarray.xarray_reduce(data, week, func=aggs["exceedance_fraction_0"])
+
+    Warnings
+    --------
+    Requires ``flox`` and ``numpy_groupies`` (which are not formal dependencies of ``s2stools``).
+    Moments are accumulated as raw power sums, so compute anomalies first to avoid loss of precision.
+    """
     try:
-        import flox.xarray
-        from flox.xarray import Aggregation
-        import numpy_groupies as npg
-    except:
+        import flox.aggregations
+        import numpy_groupies
+    except ImportError:
         print(
             "This function requires flox and numpy_groupies. Consider: pip install flox numpy_groupies"
         )
-    else:
-
-        def sample_variance(
-            group_idx, array, *, axis=-1, size=None, fill_value=np.nan, dtype=None
-        ):
-            return npg.aggregate_numpy.aggregate(
-                group_idx,
-                array,
-                func=np.var,
-                axis=axis,
-                size=size,
-                fill_value=fill_value,
-                dtype=dtype,
-                ddof=1,
+        return {}
+
+    s1, s2, s3 = [partial(_flox_power_sum, power=p) for p in (1, 2, 3)]
+    aggs = {
+        "sample_variance": _flox_aggregation(
+            "sample_variance",
+            (s1, s2, _flox_count_valid),
+            _flox_sample_variance_finalize,
+        ),
+        "skewness": _flox_aggregation(
+            "skewness", (s1, s2, s3, _flox_count_valid), _flox_skewness_finalize
+        ),
+    }
+    for thr in np.atleast_1d(thresholds):
+        count_above = partial(_flox_count_above, threshold=thr)
+        for kind, finalize in [
+            ("count", _flox_exceedance_count_finalize),
+            ("fraction", _flox_exceedance_fraction_finalize),
+        ]:
+            name = f"exceedance_{kind}_{thr:g}"
+            aggs[name] = _flox_aggregation(
+                name, (count_above, _flox_count_valid), finalize
             )
+    for name in ["nanmin", "nanmax", "nanargmin", "nanargmax"]:
+        aggs[name] = getattr(flox.aggregations, name)
+    return aggs
 
-        agg_sample_variance = Aggregation(
-            name="sample_variance",
-            numpy=sample_variance,
-            fill_value=-1,
-            chunk=None,
-            combine=None,
-        )
-        return agg_sample_variance
+
+def register_sample_variance_aggregation_for_flox():
+    """
+    Sample variance (``ddof=1``) aggregation for flox.
+
+    Returns
+    -------
+    flox.aggregations.Aggregation
+
+    See Also
+    --------
+    :func:`flox_aggregations`
+    """
+    return flox_aggregations().get("sample_variance")
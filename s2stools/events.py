@@ -1,5 +1,8 @@
-import copy
+import hashlib
+import io
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from glob import glob
 from pathlib import Path
@@ -7,7 +10,12 @@ from pathlib import Path
 import numpy as np
 import xarray as xr
 import pandas as pd
-from tqdm.autonotebook import tqdm
+from dask.base import tokenize
+
+from s2stools.cache import cached, fetch_bytes
+from s2stools.compute import _map_batches
+from s2stools.process import add_validtime
+from s2stools.utils import add_years
 
 
 class EventComposite:
@@ -16,18 +24,17 @@ class EventComposite:
     """
     Obtain the original feded data using my_event_composite.data
     """
-    comp = None
-    """
-    Access the composite dataset using my_event_composite.comp
-    """
     descr = ""
     """
     Access the composite description using my_event_composite.descr
     """
-    event_list_json = []
+    events = None
+    """
+    Access the events as :class:`EventTable` using my_event_composite.events
+    """
 
     # init
-    def __init__(self, data, events, descr, model):
+    def __init__(self, data, events, descr, model, cache_dir=None, n_workers=None):
         """
         Composite class
 
@@ -38,14 +45,21 @@ class EventComposite:
         ----------
         data : xr.Dataset
             dataset with appropriate dimensions (reftime, leadtime, hc_year, number, ...)
-        events : (str or list)
+        events : (str or list or EventTable)
             if str, then define the path, e.g., json/s2s_events/MODEL/ssw/*
-            (model will automatically replaced by self.model)
+            (model will automatically replaced by self.model), files can be .json, .npz or .parquet
             if list then of format [{fc: {reftime: None, hc_year: None, number: None}, days_since_init: None}, {...}]
         descr : str
             event description, e.g., used for plot titles
         model : str
             model name, e.g., ecmwf or ukmo
+        cache_dir : str
+            If given, finished composites are stored in this directory as netCDF, one file per variable, named by a
+            hash of the events and the data. Constructing the same composite again loads them from there.
+            Defaults to None.
+        n_workers : int
+            If given, composites are built out-of-core by streaming over the reftimes with this many workers, see
+            :func:`composite_streaming`. Defaults to None.
 
 
         Examples
@@ -72,24 +86,196 @@ class EventComposite:
         """
         self.descr = descr  # something
         self.model = model
-        # events from json
+        # events from files (.json, .npz or .parquet)
         if isinstance(events, str):
             # assert that event_jsons_path describes a path
-            self.event_list_json = _eventlist_from_json(events.replace("MODEL", model))
+            self.events = EventTable.load(events.replace("MODEL", model))
+        elif isinstance(events, EventTable):
+            self.events = events
         elif isinstance(events, list):
             # assert event_jsons_path is the list of events
-            self.event_list_json = events
+            self.events = EventTable.from_list(events)
         else:
             raise TypeError
         # assert that data has key leadtime, not days_since_init
         self.data = _dataset_ensure_leadtime_key(data)
-        # assert that event_list has key leadtime, not days_since_init
-        self.event_list_json = _eventlist_ensure_leadtime_key(self.event_list_json)
-        # create composite from event list
-        self.comp = _composite_from_eventlist(self.event_list_json, self.data)
+        self.cache_dir = cache_dir
+        self.n_workers = n_workers
+        # compile the events once, composites are built on first access per variable
+        self._index = _composite_index(self.events, self.data)
+        self._comp = {}
+        self._comp_ds = None
+
+    @property
+    def comp(self):
+        """
+        Access the composite dataset using my_event_composite.comp
+        """
+        if self._comp_ds is None:
+            self._comp_ds = xr.Dataset(
+                {var: self[var] for var in self.data.data_vars}, attrs=self.data.attrs
+            )
+        return self._comp_ds
+
+    @comp.setter
+    def comp(self, comp):
+        # e.g. a modified composite, replaces the built one
+        self._comp_ds = comp
+
+    def __getitem__(self, var):
+        """
+        Composite of the data variable `var`, built (or loaded from `cache_dir`) on first access.
+        """
+        if self._comp_ds is not None and var in self._comp_ds:
+            return self._comp_ds[var]
+        if var not in self._comp:
+            self._comp[var] = self._build(var)
+        return self._comp[var]
+
+    def _assemble(self, var):
+        if self.n_workers is None:
+            return _composite_from_index(self._index, self.data[[var]])[var]
+        return _composite_streaming(self._index, self.data[var], self.n_workers)
+
+    def _build(self, var):
+        if self.cache_dir is None:
+            return self._assemble(var)
+        path = Path(self.cache_dir) / f"{var}_{self._cache_key(var)}.nc"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            comp = self._assemble(var).to_dataset()
+            # write to a temporary file first, so that interrupted writes are not picked up
+            tmp = path.with_suffix(".tmp")
+            comp.to_netcdf(tmp)
+            os.replace(tmp, path)
+        return xr.open_dataset(path)[var]
+
+    def _cache_key(self, var):
+        # content address: compiled event positions and the token of the data source
+        sha = hashlib.sha256()
+        for key in ("reftime", "hc_year", "number", "padded_leadtime", "leadtime"):
+            sha.update(np.ascontiguousarray(self._index[key]).tobytes())
+        sha.update(tokenize(self.data[var]).encode())
+        return sha.hexdigest()[:32]
+
+    def significance(
+        self,
+        var,
+        n_samples=1_000,
+        match_season=True,
+        batch_size=100,
+        n_workers=None,
+        seed=None,
+    ):
+        """
+        Monte Carlo significance of the composite mean of `var`.
+
+        Random composites of the same size are drawn from forecasts without events: each event is replaced by a
+        random forecast with the same leadtime of the central day (and, if `match_season`, a reftime in the same
+        month). Random composites are drawn as index arrays and evaluated in batches of `batch_size` with a
+        vectorized gather, so that memory is bounded by one batch per worker.
+
+        Parameters
+        ----------
+        var : str
+            data variable
+        n_samples : int
+            number of random composites. Defaults to 1_000.
+        match_season : bool
+            draw random forecasts from the same reftime month as the event. Defaults to True.
+        batch_size : int
+            number of random composites evaluated at once. Defaults to 100.
+        n_workers : int
+            number of threads that evaluate batches in parallel. Defaults to None (no pool).
+        seed : int
+            seed for the random draws, results do not depend on `n_workers`. Defaults to None.
+
+        Returns
+        -------
+        xr.Dataset
+            ``mean`` (composite mean over events) and ``p_value`` (two-sided, ``2 * min(P(random >= mean),
+            P(random <= mean))``) for every lagtime and grid point
+
+        Examples
+        --------
+        >>> sig = ssw_composite.significance("u", n_samples=5_000, n_workers=4, seed=0)
+        >>> sig["mean"].where(sig.p_value < 0.05)
+        """
+        fc_dims = ["reftime", "hc_year", "number"]
+        da = self.data[var].transpose(*fc_dims, ..., "leadtime")
+        rest = list(da.dims[3:-1])
+        fc_shape = da.shape[:3]
+
+        # pools of forecasts without events, with data (reduced lazily for dask)
+        event_fc = np.ravel_multi_index([self._index[d] for d in fc_dims], fc_shape)
+        pool = da.notnull().any(rest + ["leadtime"]).values.ravel()
+        pool[event_fc] = False
+        fc_month = np.broadcast_to(
+            da.reftime.dt.month.values[:, None, None], fc_shape
+        ).ravel()
+        event_month = fc_month[event_fc] if match_season else np.zeros(len(event_fc))
+        groups = []
+        for month in np.unique(event_month):
+            candidates = np.flatnonzero(
+                pool & (fc_month == month if match_season else True)
+            )
+            if len(candidates) == 0:
+                raise ValueError(f"no forecasts without events in month {month}")
+            groups.append((np.flatnonzero(event_month == month), candidates))
+
+        positions = self._index["padded_leadtime"]
+        pad = self._index["pad"]
+        observed = _gathered_mean(da, event_fc[None], positions, pad)[0]
+
+        sizes = [
+            min(batch_size, n_samples - start)
+            for start in range(0, n_samples, batch_size)
+        ]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        counts = _map_batches(
+            _random_composite_counts,
+            list(zip(seeds, sizes)),
+            n_workers=n_workers,
+            executor="thread",
+            shared=dict(
+                da=da, groups=groups, positions=positions, pad=pad, observed=observed
+            ),
+        )
+        n_ge, n_le, n_valid = np.sum(counts, axis=0)
+        p_value = np.minimum(1, 2 * (np.minimum(n_ge, n_le) + 1) / (n_valid + 1))
+
+        coords = {"lagtime": self._index["lagtime"]}
+        coords.update({d: da[d].values for d in rest if d in da.coords})
+        comp_dims = [
+            "lagtime" if d == "leadtime" else d
+            for d in self.data[var].dims
+            if d not in fc_dims
+        ]
+        return xr.Dataset(
+            {
+                "mean": (["lagtime", *rest], observed),
+                "p_value": (["lagtime", *rest], p_value),
+            },
+            coords=coords,
+        ).transpose(*comp_dims)
+
+    @property
+    def event_list_json(self):
+        """
+        The events as list of dicts, in the json format (with key leadtime, not days_since_init)
+        """
+        return self.events.to_list()
+
+    @event_list_json.setter
+    def event_list_json(self, event_list):
+        self.events = EventTable.from_list(event_list)
+        # the composites are rebuilt for the new events
+        self._index = _composite_index(self.events, self.data)
+        self._comp = {}
+        self._comp_ds = None
 
     def __len__(self):
-        return len(self.comp.i)
+        return len(self._index["reftime"])
 
     def __repr__(self):
         return (
@@ -98,34 +284,478 @@ class EventComposite:
         )
 
 
-def _eventlist_from_json(path):
-    event_list = []
-    for f in glob(path):
-        with open(f) as infile:
-            event_list = event_list + json.load(infile)
-    return event_list
+def _gathered_mean(da, fc, positions, pad):
+    """
+    Mean over events of the lagged windows, for several event sets at once.
 
+    The data is read one reftime at a time and the windows are added into one accumulator of shape
+    (set, lagtime, ...), so memory does not grow with the number of events and dask data is loaded slab by slab.
 
-def _eventlist_ensure_leadtime_key(eventlist):
-    coords = list(list(eventlist[0].keys()))
-    if "leadtime" in coords:
-        return eventlist
-    elif "days_since_init" in coords:
-        return _format_eventlist_dayssinceinit_to_pdtimedeltastamp(eventlist)
-    else:
-        raise ValueError(
-            "eventlist must have one of ('leadtime', 'days_since_init') as coordinate. (Has: {})".format(
-                coords
+    Args:
+        da (DataArray): data with dimensions (reftime, hc_year, number, ..., leadtime)
+        fc (np.ndarray): flat (reftime, hc_year, number) position of each event, shape (set, event)
+        positions (np.ndarray): padded leadtime positions of each event, shape (event, lagtime)
+        pad (int): padding of the leadtime axis on both sides
+
+    Returns:
+        np.ndarray: shape (set, lagtime, ...), missing values are skipped
+    """
+    n_sets, n_lag = fc.shape[0], positions.shape[1]
+    total = np.zeros((n_sets, n_lag, *da.shape[3:-1]))
+    count = np.zeros(total.shape, dtype=np.int32)
+    reftime, hc_year, number = np.unravel_index(fc, da.shape[:3])
+    for r in np.unique(reftime):
+        # leadtime next to (hc_year, number), such that each window is one contiguous block
+        slab = np.moveaxis(np.asarray(da.isel(reftime=r).values, dtype=float), -1, 2)
+        slab = np.pad(
+            slab,
+            [(0, 0), (0, 0), (pad, pad)] + [(0, 0)] * (slab.ndim - 3),
+            constant_values=np.nan,
+        )
+        valid_slab = ~np.isnan(slab)
+        slab[~valid_slab] = 0
+        sets, events = np.nonzero(reftime == r)
+        # blocks of pairs that hold each set at most once (the n-th event of every set), such that plain += is
+        # enough and no np.add.at is needed. Cost per sample is one window gather per event.
+        rank = np.arange(len(sets)) - np.searchsorted(sets, sets)
+        order = np.argsort(rank, kind="stable")
+        for block in np.split(order, np.flatnonzero(np.diff(rank[order])) + 1):
+            s, e = sets[block], events[block]
+            index = hc_year[s, e][:, None], number[s, e][:, None], positions[e]
+            # blocks with all sets (s is sorted) are added in place, without scattering
+            full = slice(None) if len(s) == n_sets else s
+            total[full] += slab[index]
+            count[full] += valid_slab[index]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / count
+
+
+def _random_composite_counts(batch, da, groups, positions, pad, observed):
+    # how often random composites of one batch are >= and <= the observed composite mean
+    seed, n = batch
+    rng = np.random.default_rng(seed)
+    fc = np.empty((n, len(positions)), dtype=int)
+    for events, candidates in groups:
+        fc[:, events] = candidates[rng.integers(0, len(candidates), (n, len(events)))]
+    samples = _gathered_mean(da, fc, positions, pad)
+    return np.stack(
+        [
+            (samples >= observed).sum(axis=0),
+            (samples <= observed).sum(axis=0),
+            (~np.isnan(samples)).sum(axis=0),
+        ]
+    )
+
+
+class EventTable:
+    """
+    Columnar table of events: one typed NumPy array per column instead of one dict per event.
+
+    The columns ``reftime`` (datetime64), ``hc_year``, ``number`` (int64) and ``leadtime`` (timedelta64) identify
+    the events, any further columns (e.g. ``duration``, ``peak``) are carried along.
+    Converts losslessly to and from the json event lists (see :func:`find_ssw`), and is stored compactly as
+    ``.npz`` (or ``.parquet``, if pyarrow is installed).
+
+    Examples
+    --------
+    >>> events = EventTable.from_list(find_ssw(u60))
+    >>> events.save("ssw_ecmwf.npz")
+    >>> events = EventTable.load("ssw_*.npz")
+    >>> events[events.leadtime > np.timedelta64(20, "D")].to_list()[0]
+    {'fc': {'reftime': '2017-11-16', 'hc_year': -20, 'number': 3}, 'leadtime': 'P21DT0H0M0S'}
+    """
+
+    _FC_COLUMNS = ("reftime", "hc_year", "number")
+    _TIMEDELTA_COLUMNS = ("leadtime", "duration")
+
+    def __init__(self, reftime, hc_year, number, leadtime, **columns):
+        self.columns = dict(
+            reftime=np.asarray(reftime, dtype="datetime64[ns]"),
+            hc_year=np.asarray(hc_year, dtype="int64"),
+            number=np.asarray(number, dtype="int64"),
+            leadtime=np.asarray(leadtime, dtype="timedelta64[ns]"),
+        )
+        for name, values in columns.items():
+            dtype = "timedelta64[ns]" if name in self._TIMEDELTA_COLUMNS else None
+            self.columns[name] = np.asarray(values, dtype=dtype)
+        lengths = {len(v) for v in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"all columns must have the same length (got {lengths})")
+
+    @property
+    def reftime(self):
+        return self.columns["reftime"]
+
+    @property
+    def hc_year(self):
+        return self.columns["hc_year"]
+
+    @property
+    def number(self):
+        return self.columns["number"]
+
+    @property
+    def leadtime(self):
+        return self.columns["leadtime"]
+
+    def __len__(self):
+        return len(self.reftime)
+
+    def __getitem__(self, key):
+        """
+        A column (if `key` is a string), otherwise the table of the selected events (mask, slice or indices).
+        """
+        if isinstance(key, str):
+            return self.columns[key]
+        return type(self)(
+            **{name: values[key] for name, values in self.columns.items()}
+        )
+
+    def __repr__(self):
+        return (
+            f"<s2stools.events.{type(self).__name__}> of {len(self)} events\n"
+            f"\t--> columns: {list(self.columns)}"
+        )
+
+    @classmethod
+    def concat(cls, tables):
+        """
+        Concatenate tables with the same columns.
+        """
+        tables = list(tables)
+        if len(tables) == 0:
+            return cls([], [], [], [])
+        return cls(
+            **{
+                name: np.concatenate([t.columns[name] for t in tables])
+                for name in tables[0].columns
+            }
+        )
+
+    @classmethod
+    def from_list(cls, event_list):
+        """
+        Create from a json event list, with key ``leadtime`` (iso format) or ``days_since_init`` (int).
+        """
+        if len(event_list) == 0:
+            return cls([], [], [], [])
+        keys = list(event_list[0].keys())
+        if "leadtime" in keys:
+            leadtime = pd.to_timedelta([e["leadtime"] for e in event_list])
+        elif "days_since_init" in keys:
+            leadtime = pd.to_timedelta(
+                [e["days_since_init"] for e in event_list], unit="D"
+            )
+        else:
+            raise ValueError(
+                "eventlist must have one of ('leadtime', 'days_since_init') as coordinate. (Has: {})".format(
+                    keys
+                )
+            )
+        columns = {
+            name: [e["fc"][name] for e in event_list] for name in cls._FC_COLUMNS
+        }
+        for name in keys:
+            if name in ("fc", "leadtime", "days_since_init"):
+                continue
+            values = [e[name] for e in event_list]
+            columns[name] = (
+                pd.to_timedelta(values) if name in cls._TIMEDELTA_COLUMNS else values
+            )
+        return cls(leadtime=leadtime, **columns)
+
+    def to_list(self):
+        """
+        Convert to a json event list (with key ``leadtime``), as returned by :func:`find_ssw`.
+        """
+
+        def isoformat(td):
+            # format each distinct timedelta only once
+            unique, inverse = np.unique(td, return_inverse=True)
+            return np.array([pd.Timedelta(u).isoformat() for u in unique])[inverse]
+
+        columns = {
+            name: (
+                isoformat(values).tolist()
+                if name in self._TIMEDELTA_COLUMNS
+                else values.tolist()
             )
+            for name, values in self.columns.items()
+        }
+        columns["reftime"] = np.datetime_as_string(self.reftime, unit="D").tolist()
+        extra = [c for c in columns if c not in self._FC_COLUMNS]
+        return [
+            {
+                "fc": {name: columns[name][k] for name in self._FC_COLUMNS},
+                **{name: columns[name][k] for name in extra},
+            }
+            for k in range(len(self))
+        ]
+
+    def to_dataframe(self):
+        return pd.DataFrame(self.columns)
+
+    def save(self, path):
+        """
+        Save to `path`. The format is determined by the suffix: ``.npz``, ``.parquet`` or ``.json``.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".parquet":
+            try:
+                import pyarrow
+            except ImportError:
+                print("pyarrow required, consider pip install pyarrow. Saving as .npz")
+                path = path.with_suffix(".npz")
+            else:
+                self.to_dataframe().to_parquet(path)
+                return path
+        if path.suffix == ".json":
+            with open(path, "w") as fout:
+                json.dump(self.to_list(), fout)
+        else:
+            np.savez_compressed(path, **self.columns)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load and concatenate all files matching `path` (may contain wildcards), each ``.npz``, ``.parquet`` or
+        ``.json``.
+        """
+        files = glob(str(path))
+        if len(files) == 0:
+            raise FileNotFoundError(f"no event files found: {path}")
+        tables = []
+        for f in files:
+            if f.endswith(".npz"):
+                with np.load(f) as npz:
+                    tables.append(cls(**{name: npz[name] for name in npz.files}))
+            elif f.endswith(".parquet"):
+                df = pd.read_parquet(f)
+                tables.append(
+                    cls(
+                        **{
+                            name: (
+                                df[name].to_numpy(dtype=str)
+                                if df[name].dtype == object
+                                or isinstance(df[name].dtype, pd.StringDtype)
+                                else df[name].to_numpy()
+                            )
+                            for name in df.columns
+                        }
+                    )
+                )
+            else:
+                with open(f) as infile:
+                    tables.append(cls.from_list(json.load(infile)))
+        return cls.concat(tables)
+
+
+class EventStore(EventTable):
+    """
+    Event table that is sorted by (reftime, hc_year, number, leadtime) and indexed by reftime.
+
+    Supports vectorized queries by forecast coordinates and leadtime, set operations between event catalogues
+    (e.g. predicted versus observed events) and writing one file per reftime in a single pass.
+
+    Examples
+    --------
+    >>> store = EventStore.load("ssw_*.npz")
+    >>> djf = store.query(months=[12, 1, 2], hc_year=slice(-10, -1), leadtime=slice(10, 30))
+    >>> missed = observed.difference(predicted, on=["reftime", "hc_year"])
+    >>> store.save_split("ssw.npz")  # ssw_ref20171116.npz, ssw_ref20171120.npz, ...
+    """
+
+    _SORT_COLUMNS = ("reftime", "hc_year", "number", "leadtime")
+
+    def __init__(self, reftime, hc_year, number, leadtime, **columns):
+        super().__init__(reftime, hc_year, number, leadtime, **columns)
+        order = np.lexsort([self.columns[c] for c in self._SORT_COLUMNS[::-1]])
+        self.columns = {name: values[order] for name, values in self.columns.items()}
+        # events of reftime self.reftimes[k] are self[self.offsets[k] : self.offsets[k + 1]]
+        self.reftimes, first = np.unique(self.reftime, return_index=True)
+        self.offsets = np.append(first, len(self))
+
+    @classmethod
+    def from_table(cls, table):
+        return cls(**table.columns)
+
+    def groups(self):
+        """
+        Iterate over (reftime, events of that reftime).
+        """
+        for k, ref in enumerate(self.reftimes):
+            yield ref, self[self.offsets[k] : self.offsets[k + 1]]
+
+    def mask(
+        self,
+        reftime=None,
+        months=None,
+        hc_year=None,
+        number=None,
+        leadtime=None,
+        **columns,
+    ):
+        """
+        Boolean mask of the events that match all criteria.
+
+        Each criterion can be a single value, a list of values, an inclusive ``slice(start, stop)`` or a callable
+        that maps the column to a boolean array. Integer leadtimes are interpreted as days.
+
+        Parameters
+        ----------
+        reftime, hc_year, number, leadtime :
+            criteria for the respective column
+        months : int or list
+            months of the reftime, e.g. ``[12, 1, 2]``
+        columns :
+            criteria for additional columns, e.g. ``peak=lambda p: p < -3``
+
+        Returns
+        -------
+        np.ndarray
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if isinstance(reftime, slice):
+            # events are sorted by reftime, so a range of reftimes is a contiguous block
+            start, stop = (
+                None if t is None else _as_column_dtype(t, self.reftime)[0]
+                for t in (reftime.start, reftime.stop)
+            )
+            lo = 0 if start is None else np.searchsorted(self.reftime, start, "left")
+            hi = (
+                len(self)
+                if stop is None
+                else np.searchsorted(self.reftime, stop, "right")
+            )
+            mask[:lo] = False
+            mask[hi:] = False
+            reftime = None
+        criteria = dict(
+            reftime=reftime, hc_year=hc_year, number=number, leadtime=leadtime
         )
+        criteria.update(columns)
+        for name, criterion in criteria.items():
+            if criterion is not None:
+                mask &= _match(self.columns[name], criterion)
+        if months is not None:
+            month = self.reftime.astype("datetime64[M]").astype("int64") % 12 + 1
+            mask &= np.isin(month, months)
+        return mask
+
+    def query(self, **criteria):
+        """
+        Events that match all criteria, see :meth:`EventStore.mask`.
+
+        Returns
+        -------
+        EventStore
+        """
+        return self[self.mask(**criteria)]
 
+    def isin(self, other, on=_SORT_COLUMNS):
+        """
+        Boolean mask of the events that also occur in `other`, compared by the columns `on`.
 
-def _format_eventlist_dayssinceinit_to_pdtimedeltastamp(eventlist):
-    new_eventlist = copy.deepcopy(eventlist)
-    for e in new_eventlist:
-        e["leadtime"] = e.pop("days_since_init")
-        e["leadtime"] = pd.Timedelta(e["leadtime"], "D").isoformat()
-    return new_eventlist
+        Parameters
+        ----------
+        other : EventTable
+        on : list
+            columns to compare, e.g. ``["reftime", "hc_year", "number"]`` to match forecasts regardless of leadtime
+
+        Returns
+        -------
+        np.ndarray
+        """
+        ids = _row_ids([self, other], on)
+        return np.isin(ids[0], ids[1])
+
+    def intersection(self, other, on=_SORT_COLUMNS):
+        """
+        Events that also occur in `other` (compared by the columns `on`).
+        """
+        return self[self.isin(other, on=on)]
+
+    def difference(self, other, on=_SORT_COLUMNS):
+        """
+        Events that do not occur in `other` (compared by the columns `on`).
+        """
+        return self[~self.isin(other, on=on)]
+
+    def union(self, other, on=_SORT_COLUMNS):
+        """
+        Events of both catalogues, events of `other` that occur in `self` (compared by the columns `on`) are dropped.
+        """
+        other = other if isinstance(other, EventStore) else EventStore.from_table(other)
+        return EventStore.concat([self, other.difference(self, on=on)])
+
+    def save_split(self, path):
+        """
+        Save one file per reftime, e.g. ``ssw.npz`` becomes ``ssw_ref20171116.npz``, ``ssw_ref20171120.npz``, ...
+
+        Returns
+        -------
+        list
+            paths of the written files
+        """
+        path_base, suffix = os.path.splitext(str(path))
+        return [
+            events.save(
+                "{}_ref{}{}".format(
+                    path_base,
+                    np.datetime_as_string(ref, unit="D").replace("-", ""),
+                    suffix,
+                )
+            )
+            for ref, events in self.groups()
+        ]
+
+
+def _as_column_dtype(values, column):
+    """
+    Convert query values to the dtype of `column` (integers are days for timedelta columns).
+    """
+    values = np.atleast_1d(values)
+    if np.issubdtype(column.dtype, np.timedelta64):
+        if np.issubdtype(values.dtype, np.number):
+            return pd.to_timedelta(values, unit="D").values
+        return pd.to_timedelta(values).values
+    if np.issubdtype(column.dtype, np.datetime64):
+        return pd.to_datetime(values).values
+    return values
+
+
+def _match(column, criterion):
+    if callable(criterion):
+        return np.asarray(criterion(column), dtype=bool)
+    if isinstance(criterion, slice):
+        match = np.ones(len(column), dtype=bool)
+        if criterion.start is not None:
+            match &= column >= _as_column_dtype(criterion.start, column)[0]
+        if criterion.stop is not None:
+            match &= column <= _as_column_dtype(criterion.stop, column)[0]
+        return match
+    return np.isin(column, _as_column_dtype(criterion, column))
+
+
+def _row_ids(tables, on):
+    """
+    Integer id per event, equal for events with equal values in the columns `on`, for each of the `tables`.
+    """
+    rows = np.concatenate(
+        [np.stack([t.columns[c].view("int64") for c in on], axis=-1) for t in tables]
+    )
+    _, ids = np.unique(rows, axis=0, return_inverse=True)
+    return np.split(ids.ravel(), np.cumsum([len(t) for t in tables])[:-1])
+
+
+def _eventlist_from_json(path):
+    event_list = []
+    for f in glob(path):
+        with open(f) as infile:
+            event_list.extend(json.load(infile))
+    return event_list
 
 
 def _dataset_ensure_leadtime_key(dataset):
@@ -147,39 +777,318 @@ def _dataset_ensure_leadtime_key(dataset):
         )
 
 
-def _composite_from_eventlist(event_list, data):
-    event_comp = []
-    missing_reftime_keys = []
-    for event in tqdm(event_list, desc="Opening Events"):
-        central_day = np.timedelta64(pd.Timedelta(event["leadtime"]))
-        if np.datetime64(event["fc"]["reftime"]) in data.reftime.values:
-            forecast = data.sel(
-                reftime=event["fc"]["reftime"],
-                hc_year=event["fc"]["hc_year"],
-                number=event["fc"]["number"],
-            )
-            event_comp.append(
-                forecast.assign_coords(leadtime=data.leadtime - central_day)
-                .rename(leadtime="lagtime")
-                .assign_coords(leadtime=central_day)
+def _eventlist_to_arrays(event_list):
+    """
+    Convert an event list of dicts (or an :class:`EventTable`) to typed arrays (reftime, hc_year, number, leadtime).
+    """
+    if not isinstance(event_list, EventTable):
+        event_list = EventTable.from_list(event_list)
+    return (
+        event_list.reftime,
+        event_list.hc_year,
+        event_list.number,
+        event_list.leadtime,
+    )
+
+
+def _event_indices(reftime, hc_year, number, leadtime, data):
+    """
+    Integer positions of the events along the dimensions of `data`.
+
+    Events with a reftime that is not in `data` are dropped (with a warning), all other coordinates must exist.
+
+    Returns
+    -------
+    dict
+        positions along reftime, hc_year, number and leadtime, and the boolean mask of kept events
+    """
+    ref_idx = data.get_index("reftime").get_indexer(reftime)
+    keep = ref_idx >= 0
+    for missing_reftime in np.unique(reftime[~keep]):
+        print(
+            "KeyError Warning: reftime {} not in data".format(
+                np.datetime_as_string(missing_reftime, unit="D")
             )
-        elif event["fc"]["reftime"] in missing_reftime_keys:
-            continue
-        else:
-            missing_reftime_keys.append(event["fc"]["reftime"])
-            print(
-                "KeyError Warning: reftime {} not in data".format(
-                    event["fc"]["reftime"]
-                )
+        )
+
+    idx = dict(reftime=ref_idx[keep])
+    for dim, values in [
+        ("hc_year", hc_year),
+        ("number", number),
+        ("leadtime", leadtime),
+    ]:
+        idx[dim] = data.get_index(dim).get_indexer(values[keep])
+        if (idx[dim] < 0).any():
+            raise KeyError(
+                f"{dim} {np.unique(values[keep][idx[dim] < 0])} of events not in data"
             )
+    idx["keep"] = keep
+    return idx
+
+
+def _composite_index(event_list, data):
+    """
+    Compile the events once into integer positions along the dimensions of `data`, see
+    :func:`_composite_from_eventlist`.
+
+    Returns
+    -------
+    dict
+        positions along reftime, hc_year, number and the padded leadtime axis, the padding, and the coordinates
+        lagtime and leadtime of the composite
+    """
+    reftime, hc_year, number, leadtime = _eventlist_to_arrays(event_list)
+    idx = _event_indices(reftime, hc_year, number, leadtime, data)
+
+    lt = data.get_index("leadtime")
+    step = lt[1] - lt[0]
+    if not (np.diff(lt.values) == step.to_timedelta64()).all():
+        raise ValueError("leadtime must be evenly spaced to create a composite")
+
+    central = idx.pop("leadtime")
+    if len(central) == 0:
+        raise ValueError("no events to create a composite from")
+    pad = int(central.max() - central.min())
+    lag_steps = np.arange(-central.max(), len(lt) - central.min())
+    # position along the padded leadtime axis, for every event and lagtime
+    idx["padded_leadtime"] = central[:, None] + lag_steps[None, :] + pad
+    idx["pad"] = pad
+    idx["lagtime"] = (lag_steps * step.to_timedelta64()).astype("timedelta64[ns]")
+    idx["leadtime"] = leadtime[idx.pop("keep")]
+    return idx
+
+
+def _composite_from_index(idx, data):
+    """
+    Gather the composite of `data` for the compiled events `idx` (see :func:`_composite_index`).
+    """
+    indexers = dict(
+        reftime=xr.DataArray(idx["reftime"], dims="i"),
+        hc_year=xr.DataArray(idx["hc_year"], dims="i"),
+        number=xr.DataArray(idx["number"], dims="i"),
+        leadtime=xr.DataArray(idx["padded_leadtime"], dims=("i", "lagtime")),
+    )
+    # variables without some of the forecast dimensions (e.g. constant fields) are passed through along those
+    data_padded = data.drop_vars("leadtime", errors="ignore")
+    if "leadtime" in data.dims:
+        data_padded = data_padded.pad(leadtime=(idx["pad"], idx["pad"]))
+    event_comp = data_padded.isel({d: i for d, i in indexers.items() if d in data.dims})
+
+    # keep the layout of the input: i first, lagtime where leadtime was
+    for var in event_comp.data_vars:
+        dims = [
+            "lagtime" if d == "leadtime" else d
+            for d in data[var].dims
+            if d not in ("reftime", "hc_year", "number")
+        ]
+        event_comp[var] = event_comp[var].transpose(
+            *(["i"] if "i" in event_comp[var].dims else []), *dims
+        )
+
+    return event_comp.assign_coords(
+        lagtime=idx["lagtime"],
+        leadtime=("i", idx["leadtime"]),
+        i=np.arange(len(idx["reftime"])),
+    )
+
+
+def _composite_from_eventlist(event_list, data):
+    """
+    Composite of all events in `event_list` (list or :class:`EventTable`), with dimension `i` (event) and `lagtime`
+    (relative to the event).
+
+    The event list is converted once to integer positions. The leadtime axis of `data` is padded on both sides, so
+    that the lagtime window of every event becomes a shifted slice of the padded axis and all events can be gathered
+    with a single vectorized ``isel``.
+    """
+    return _composite_from_index(_composite_index(event_list, data), data)
+
+
+def composite_streaming(event_list, data, n_workers=1, out_dir=None):
+    """
+    Composite of all events, built out-of-core by streaming over the reftimes.
+
+    Events are grouped by reftime, so that the data of each reftime is loaded exactly once (e.g. one file of an
+    ``open_mfdataset`` over per-reftime files) and all events of that reftime are extracted with a vectorized gather.
+    Reftimes are processed in parallel by `n_workers` threads, peak memory is bounded by one reftime per worker plus
+    the output.
 
-    event_comp = xr.concat(event_comp, dim="i")
+    Parameters
+    ----------
+    event_list : list or EventTable
+        events, see :class:`EventComposite`
+    data : xr.Dataset
+        dataset with dimensions (reftime, leadtime, hc_year, number, ...)
+    n_workers : int
+        number of reftimes that are processed at the same time. Defaults to 1.
+    out_dir : str
+        If given, the composite of each variable is written to ``out_dir/<var>.npy`` (memory-mapped), instead of
+        being held in memory. Defaults to None.
+
+    Returns
+    -------
+    xr.Dataset
+        same as ``EventComposite(data, event_list, ...).comp``
+    """
+    data = _dataset_ensure_leadtime_key(data)
+    idx = _composite_index(event_list, data)
+    return xr.Dataset(
+        {
+            var: _composite_streaming(idx, data[var], n_workers, out_dir)
+            for var in data.data_vars
+        },
+        attrs=data.attrs,
+    )
+
+
+def _composite_streaming(idx, da, n_workers=1, out_dir=None):
+    """
+    Composite of the DataArray `da` for the compiled events `idx`, one reftime at a time.
+    """
+    fc_dims = ["reftime", "hc_year", "number"]
+    if not set(fc_dims + ["leadtime"]).issubset(da.dims):
+        return _composite_from_index(idx, da.to_dataset())[da.name]
+
+    rest = [d for d in da.dims if d not in fc_dims + ["leadtime"]]
+    n_lag = idx["padded_leadtime"].shape[1]
+    # padding introduces missing values
+    dtype = da.dtype if np.issubdtype(da.dtype, np.floating) else np.float64
+    shape = (len(idx["reftime"]), *[da.sizes[d] for d in rest], n_lag)
+    if out_dir is None:
+        out = np.empty(shape, dtype=dtype)
+    else:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+        out = np.lib.format.open_memmap(
+            Path(out_dir) / f"{da.name}.npy", mode="w+", dtype=dtype, shape=shape
+        )
+
+    # events grouped by reftime position
+    order = np.argsort(idx["reftime"], kind="stable")
+    reftimes, starts = np.unique(idx["reftime"][order], return_index=True)
+    groups = np.split(order, starts[1:])
+    pad = [(0, 0)] * (len(rest) + 2) + [(idx["pad"], idx["pad"])]
+
+    def gather(reftime, events):
+        slab = (
+            da.isel(reftime=reftime)
+            .transpose("hc_year", "number", *rest, "leadtime")
+            .values.astype(dtype, copy=False)
+        )
+        slab = np.pad(slab, pad, constant_values=np.nan)
+        values = slab[
+            idx["hc_year"][events, None],
+            idx["number"][events, None],
+            ...,
+            idx["padded_leadtime"][events],
+        ]
+        # advanced indices come first: (event, lagtime, *rest)
+        out[events] = np.moveaxis(values, 1, -1)
+
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        # consume the iterator to propagate errors
+        list(pool.map(gather, reftimes, groups))
+    if out_dir is not None:
+        out.flush()
+
+    template = _composite_from_index(idx, da.coords.to_dataset())
+    comp = xr.DataArray(
+        out,
+        dims=["i", *rest, "lagtime"],
+        coords=template.coords,
+        name=da.name,
+        attrs=da.attrs,
+    )
+    return comp.transpose(
+        "i", *["lagtime" if d == "leadtime" else d for d in da.dims if d not in fc_dims]
+    )
+
+
+def _ssw_onset(u, window, start, require_return_westerly=None):
+    # u: (..., leadtime), window and start are boolean masks along leadtime
+    startwest = np.all(u[..., start] > 0, axis=-1)
+    east = (u < 0) & window
+    valid = east.any(axis=-1) & startwest
+    first = np.argmax(east, axis=-1)
+
+    if require_return_westerly:
+        # length of the westerly run that ends at each day
+        west = u > 0
+        n = np.cumsum(west, axis=-1)
+        run_length = n - np.maximum.accumulate(np.where(west, 0, n), axis=-1)
+        after_onset = np.arange(u.shape[-1]) > first[..., None]
+        returns = ((run_length >= require_return_westerly) & after_onset).any(axis=-1)
+        valid = valid & returns
+
+    return valid[..., None] & (np.arange(u.shape[-1]) == first[..., None])
+
+
+def ssw_onset(
+    u60_10hPa,
+    buffer_start=10,
+    buffer_end=10,
+    require_westwind_start=10,
+    require_return_westerly=None,
+):
+    """
+    Onset days of Sudden Stratospheric Warmings in S2S forecasts, as a boolean mask.
+
+    Detection is computed for all forecasts at once (blockwise under dask): the first day with easterly u60 within
+    the allowed window of leadtimes is the onset, if the forecast starts with westerly winds.
+
+    Parameters
+    ----------
+    u60_10hPa : xr.DataArray
+        zonal wind at 60N 10hPa, requires dimension `leadtime`
+    buffer_start : int
+        When are events allowed to happen the earliest?
+    buffer_end : int
+        When are events allowed to happen the latest?
+    require_westwind_start : int
+        How many days should u60 start positive?
+    require_return_westerly : int
+        If given, only count events after which u60 returns to westerlies for at least this many consecutive
+        days within the forecast (to exclude final warmings). Defaults to None.
+
+    Returns
+    -------
+    xr.DataArray
+        True at the onset day of each event, same dimensions as `u60_10hPa`
+
+    See Also
+    --------
+    :func:`find_ssw`
+    """
+    buffer_start, buffer_end, require_westwind_start = map(
+        _to_timedelta64, [buffer_start, buffer_end, require_westwind_start]
+    )
+    leadtime = u60_10hPa.leadtime.values
+    window = (leadtime >= buffer_start) & (leadtime <= leadtime[-1] - buffer_end)
+    start = (leadtime >= np.timedelta64(0, "D")) & (
+        leadtime <= require_westwind_start - np.timedelta64(1, "D")
+    )
 
-    return event_comp.assign_coords(i=event_comp.i)
+    return xr.apply_ufunc(
+        _ssw_onset,
+        u60_10hPa,
+        kwargs=dict(
+            window=window,
+            start=start,
+            require_return_westerly=require_return_westerly,
+        ),
+        input_core_dims=[["leadtime"]],
+        output_core_dims=[["leadtime"]],
+        dask="parallelized",
+        output_dtypes=[bool],
+        dask_gufunc_kwargs=dict(allow_rechunk=True),
+    ).transpose(*u60_10hPa.dims)
 
 
 def find_ssw(
-    u60_10hPa, buffer_start=10, buffer_end=10, require_westwind_start=10
+    u60_10hPa,
+    buffer_start=10,
+    buffer_end=10,
+    require_westwind_start=10,
+    require_return_westerly=None,
 ) -> list:
     """
     Find Sudden Stratospheric Warmings in S2S forecast.
@@ -194,6 +1103,9 @@ def find_ssw(
         When are events allowed to happen the latest?
     require_westwind_start : int
         How many days should u60 start positive?
+    require_return_westerly : int
+        If given, u60 needs to return to westerlies for at least this many consecutive days after the event
+        (within the forecast). Defaults to None.
 
     Returns
     -------
@@ -201,7 +1113,7 @@ def find_ssw(
 
     See Also
     --------
-    :func:`s2stools.events._composite_from_eventlist`
+    :func:`s2stools.events._composite_from_eventlist`, :func:`ssw_onset`
 
     Warnings
     --------
@@ -210,46 +1122,224 @@ def find_ssw(
     In the future, it would be nice to append the reanalysis ahead of the forecast to check the preceding
     vortex evolution.
     """
-    buffer_start, buffer_end, require_westwind_start = map(
-        _to_timedelta64, [buffer_start, buffer_end, require_westwind_start]
+    fc_dims = ["reftime", "hc_year", "number"]
+    var = u60_10hPa.squeeze(
+        [d for d in u60_10hPa.dims if u60_10hPa.sizes[d] == 1 and d not in fc_dims]
+    ).transpose(*fc_dims, "leadtime")
+
+    onset = ssw_onset(
+        var,
+        buffer_start=buffer_start,
+        buffer_end=buffer_end,
+        require_westwind_start=require_westwind_start,
+        require_return_westerly=require_return_westerly,
+    )
+    require_westwind_start = _to_timedelta64(require_westwind_start)
+    start_days = var.sel(
+        leadtime=slice("0D", require_westwind_start - np.timedelta64(1, "D"))
     )
+    # onset and the diagnostics are computed together, in one pass over the data
+    counts = xr.Dataset(
+        dict(
+            onset=onset,
+            valid=var.notnull().any("leadtime"),
+            startwest=(start_days > 0).all("leadtime"),
+        )
+    ).compute()
 
-    var = u60_10hPa.squeeze()
-    var_stacked = var.stack(fc=["reftime", "hc_year", "number"])
-    var_stacked_valid = var_stacked.dropna("fc", how="all")
     print("number of:")
-    print("\t all forecast combinations: ", len(var_stacked.fc))
-    print("\t valid forecast combinations: ", len(var_stacked_valid.fc))
+    print("\t all forecast combinations: ", counts.valid.size)
+    print("\t valid forecast combinations: ", int(counts.valid.sum()))
+    print(
+        f"\t forecasts start start with {require_westwind_start} days westwind: {int(counts.startwest.sum())}"
+    )
 
-    fc_startwest = (
-        var_stacked.where(
-            (var_stacked.sel(leadtime=slice("0D", require_westwind_start - 1)) > 0)
+    r, h, n, lt = np.nonzero(counts.onset.values)
+    events = [
+        [(pd.Timestamp(reftime), hc_year, number), leadtime]
+        for reftime, hc_year, number, leadtime in zip(
+            var.reftime.values[r],
+            var.hc_year.values[h],
+            var.number.values[n],
+            var.leadtime.values[lt],
         )
-        .dropna("fc", how="any")
-        .fc
-    )
+    ]
 
-    print(
-        f"\t forecasts start start with {require_westwind_start} days westwind: {len(fc_startwest)}"
-    )
+    event_dict = _eventlist_to_dict(events)
 
-    events = []
-    for fc in tqdm(fc_startwest[:], desc="Scanning Forecasts for Events"):
-        fc_run = var_stacked.sel(fc=fc)
+    return event_dict
 
-        # find zero crossing
-        last_day = fc_run.leadtime.values[-1]
-        eastwinddays = fc_run.where(
-            fc_run.sel(leadtime=slice(buffer_start, last_day - buffer_end)) < 0,
-            drop=True,
-        ).leadtime
 
-        if len(eastwinddays) > 0:
-            events.append([list(np.atleast_1d(fc)[0]), eastwinddays.values[0]])
+def event_probability(data, detector=ssw_onset, **detector_kwargs):
+    """
+    Fraction of ensemble members in which an event has started by each validtime.
 
-    event_dict = _eventlist_to_dict(events)
+    The detector computes the onset mask for all forecasts at once; the onsets are accumulated along `leadtime`
+    and reduced over `number`, lazily in a single pass if `data` is a dask array.
 
-    return event_dict
+    Parameters
+    ----------
+    data : xr.DataArray
+        requires dimensions `number` and `leadtime`, e.g. zonal wind at 60N 10hPa
+    detector : callable
+        function that maps `data` to a boolean onset mask with the dimensions of `data`, e.g. :func:`ssw_onset`.
+        Defaults to :func:`ssw_onset`.
+    detector_kwargs :
+        passed on to `detector`, e.g. ``require_return_westerly=10``
+
+    Returns
+    -------
+    xr.DataArray
+        probability between 0 and 1 without dimension `number`, with coordinate `validtime` (if `data` has
+        dimensions `reftime` and `hc_year`). Members without data are not counted.
+
+    Examples
+    --------
+    >>> p_ssw = event_probability(ds.u.sel(latitude=60, level=10).mean("longitude"))
+    >>> p_ssw.sel(hc_year=0).plot(x="leadtime", hue="reftime")
+    """
+    onset = detector(data, **detector_kwargs)
+    occurred = onset.cumsum("leadtime") > 0
+    valid = data.notnull().any("leadtime")
+    probability = (occurred & valid).sum("number") / valid.sum("number")
+    probability = probability.rename("event_probability")
+    probability.attrs = dict(long_name="fraction of members with event")
+    if {"reftime", "hc_year", "leadtime"}.issubset(probability.dims) and (
+        "validtime" not in probability.coords
+    ):
+        probability = add_validtime(probability)
+    return probability
+
+
+def _run_length_events(condition, values, min_duration, separation, peak):
+    """
+    Run-length encoding of a boolean array (series, leadtime) in one pass.
+
+    Runs shorter than `min_duration` are discarded, runs that are less than `separation` steps apart are merged.
+
+    Returns
+    -------
+    (series, onset, duration, peak) arrays, one entry per event
+    """
+    n_series, n_lt = condition.shape
+    padded = np.zeros((n_series, n_lt + 2), dtype="int8")
+    padded[:, 1:-1] = condition
+    change = np.diff(padded, axis=1)
+    # starts and ends come in the same (row-major) order, one of each per run
+    series, start = np.nonzero(change == 1)
+    _, end = np.nonzero(change == -1)
+
+    long_enough = (end - start) >= min_duration
+    series, start, end = series[long_enough], start[long_enough], end[long_enough]
+
+    gap = start[1:] - end[:-1]
+    new_event = np.ones(len(start), dtype=bool)
+    new_event[1:] = (series[1:] != series[:-1]) | (gap >= separation)
+    first = np.flatnonzero(new_event)
+    series, start = series[first], start[first]
+    end = np.maximum.reduceat(end, first) if len(first) else end[first]
+
+    # peak over the condition days of each event, spans are contiguous in the flattened array
+    flat = np.append(np.where(condition, values, np.nan).ravel(), np.nan)
+    spans = np.stack([series * n_lt + start, series * n_lt + end], axis=-1).ravel()
+    reduce = {"max": np.fmax, "min": np.fmin}[peak]
+    peaks = reduce.reduceat(flat, spans)[::2] if len(spans) else flat[:0]
+
+    return series, start, end - start, peaks
+
+
+def detect(
+    data,
+    condition,
+    min_duration=1,
+    buffer_start=0,
+    buffer_end=0,
+    separation=0,
+    peak="max",
+) -> list:
+    """
+    Detect threshold-based events in S2S forecasts, e.g., NAM extremes, blocking episodes or cold spells.
+
+    The condition is evaluated for all forecasts at once and run-length encoded along `leadtime` in a single
+    NumPy pass. If the condition has additional dimensions (e.g. several thresholds), all of them are detected in
+    the same pass.
+
+    Parameters
+    ----------
+    data : xr.DataArray
+        requires dimensions `reftime`, `hc_year`, `number`, `leadtime`
+    condition : callable or xr.DataArray
+        Boolean condition, e.g. ``lambda x: x < -3``. If callable, it is applied to `data`.
+    min_duration : int
+        Minimum number of consecutive leadtime steps the condition must hold. Defaults to 1.
+    buffer_start : int
+        When are events allowed to start the earliest (days)? Defaults to 0.
+    buffer_end : int
+        When are events allowed to start the latest (days before the end of the forecast)? Defaults to 0.
+    separation : int
+        Runs that are less than `separation` steps apart are merged into one event. Defaults to 0.
+    peak : str
+        One of ``"max"``, ``"min"``: how to determine the peak value of `data` during the event. Defaults to ``"max"``.
+
+    Returns
+    -------
+    list
+        Event list of the same format as :func:`find_ssw`, with additional keys ``"duration"``, ``"peak"`` and
+        one key for each additional dimension of the condition. Can be passed to :class:`EventComposite`.
+
+    Examples
+    --------
+    >>> # NAM extremes below -2 or -3 for at least 3 days
+    >>> thresholds = xr.DataArray([-2, -3], dims="threshold", coords={"threshold": [-2, -3]})
+    >>> events = detect(nam1000, lambda x: x < thresholds, min_duration=3, separation=5, peak="min")
+    >>> events[0]
+    {'fc': {'reftime': '2017-11-16', 'hc_year': -20, 'number': 3}, 'leadtime': 'P12DT0H0M0S',
+     'duration': 'P4DT0H0M0S', 'peak': -3.4, 'threshold': -2}
+    >>> ssw_like = EventComposite(data, [e for e in events if e["threshold"] == -3], descr="NAM < -3", model="ecmwf")
+    """
+    buffer_start, buffer_end = map(_to_timedelta64, [buffer_start, buffer_end])
+    fc_dims = ["reftime", "hc_year", "number"]
+
+    cond = condition(data) if callable(condition) else condition
+    data, cond = xr.broadcast(data, cond)
+    extra_dims = [d for d in cond.dims if d not in fc_dims + ["leadtime"]]
+    order = fc_dims + extra_dims + ["leadtime"]
+    cond, data = cond.transpose(*order), data.transpose(*order)
+
+    series_shape = cond.shape[:-1]
+    n_lt = cond.shape[-1]
+    series, onset, duration, peaks = _run_length_events(
+        cond.values.reshape(-1, n_lt).astype(bool),
+        data.values.reshape(-1, n_lt),
+        min_duration=min_duration,
+        separation=separation,
+        peak=peak,
+    )
+
+    leadtime = data.leadtime.values
+    allowed = (leadtime[onset] >= buffer_start) & (
+        leadtime[onset] <= leadtime[-1] - buffer_end
+    )
+    series, onset, duration, peaks = (
+        a[allowed] for a in (series, onset, duration, peaks)
+    )
+
+    positions = np.unravel_index(series, series_shape)
+    coords = [data[d].values[pos] for d, pos in zip(fc_dims + extra_dims, positions)]
+    events = _eventlist_to_dict(
+        [
+            [(pd.Timestamp(r), h, n), lt]
+            for r, h, n, lt in zip(*coords[:3], leadtime[onset])
+        ]
+    )
+    # daily data is assumed if there is only one leadtime
+    step = leadtime[1] - leadtime[0] if leadtime.size > 1 else np.timedelta64(1, "D")
+    for k, e in enumerate(events):
+        e["duration"] = pd.Timedelta(duration[k] * step).isoformat()
+        e["peak"] = float(peaks[k])
+        for d, c in zip(extra_dims, coords[3:]):
+            e[d] = c[k].item()
+    return events
 
 
 def _eventlist_to_dict(events):
@@ -282,6 +1372,10 @@ def _eventdict_to_json(event_dict, path, short_path=False, split_reftimes=False)
     )
 
     def save_dict(e_d, path):
+        if isinstance(e_d, EventTable):
+            # format from suffix (.json, .npz or .parquet)
+            e_d.save(path)
+            return
         Path(path.rpartition("/")[0]).mkdir(parents=True, exist_ok=True)
         with open(path, "w") as fout:
             json.dump(e_d, fout)
@@ -291,16 +1385,16 @@ def _eventdict_to_json(event_dict, path, short_path=False, split_reftimes=False)
         save_dict(event_dict, path)
     else:
         event_dict_splitted = _events_split_reftime(event_dict)
+        path_base, suffix = os.path.splitext(path)
         for ref in event_dict_splitted:
             ref_str = ref["reftime"]
             events_oneref = ref["events"]
             path_splitted = (
                 DEFAULT_DIR
-                + path.split(".json")[0]
-                + "_ref{}.json".format(ref_str.replace("-", ""))
+                + path_base
+                + "_ref{}{}".format(ref_str.replace("-", ""), suffix)
                 if short_path
-                else path.split(".json")[0]
-                + "_ref{}.json".format(ref_str.replace("-", ""))
+                else path_base + "_ref{}{}".format(ref_str.replace("-", ""), suffix)
             )
             save_dict(events_oneref, path_splitted)
 
@@ -311,27 +1405,39 @@ def _events_split_reftime(eventdict):
     event_dict = [{"fc": {"reftime": , "hc_year": , "number": }, "leadtime": }, {...}]
     to
     event_dict_splitted = [{"reftime": , "events": [{"fc": {"reftime": , "hc_year": , "number": }, "leadtime": }, {...}]}, {...}]
-    """
-    event_dict_splitted = []
 
-    for e in eventdict:
-        ref = e["fc"]["reftime"]
-        idx = next(
-            (
-                index
-                for (index, d) in enumerate(event_dict_splitted)
-                if d.get("reftime") == ref
-            ),
-            None,
+    If `eventdict` is an :class:`EventTable`, "events" are EventTables as well.
+    """
+    if isinstance(eventdict, EventStore):
+        return [
+            {"reftime": np.datetime_as_string(ref, unit="D"), "events": events}
+            for ref, events in eventdict.groups()
+        ]
+    if isinstance(eventdict, EventTable):
+        # reftimes in order of first appearance, events keep their order within each reftime
+        reftimes, first, inverse = np.unique(
+            eventdict.reftime, return_index=True, return_inverse=True
         )
-        if idx != None:
-            # reftime exists
-            event_dict_splitted[idx]["events"].append(e)
-        else:
-            # reftime does not exist yet
-            event_dict_splitted.append({"reftime": ref, "events": [e]})
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        # stable sort by group keeps the order of the events within each group
+        by_group = np.argsort(rank[inverse], kind="stable")
+        bounds = np.cumsum(np.bincount(rank[inverse], minlength=len(order)))[:-1]
+        return [
+            {
+                "reftime": np.datetime_as_string(reftimes[k], unit="D"),
+                "events": eventdict[idx],
+            }
+            for k, idx in zip(order, np.split(by_group, bounds))
+        ]
+
+    # dicts keep insertion order, i.e. reftimes in order of first appearance
+    events_by_reftime = {}
+    for e in eventdict:
+        events_by_reftime.setdefault(e["fc"]["reftime"], []).append(e)
 
-    return event_dict_splitted
+    return [{"reftime": ref, "events": e} for ref, e in events_by_reftime.items()]
 
 
 def _to_timedelta64(a, assume="D"):
@@ -349,6 +1455,9 @@ def _to_timedelta64(a, assume="D"):
     return a
 
 
+SSW_COMPENDIUM_URL = "https://csl.noaa.gov/groups/csl8/sswcompendium/majorevents.html"
+
+
 def ssw_compendium_event_dates(column="ERA-Interim"):
     """
     Read html table from SSW compendium
@@ -365,11 +1474,19 @@ def ssw_compendium_event_dates(column="ERA-Interim"):
     dates : pd.Series
         Sudden Warming dates
 
+    Notes
+    -----
+    Results are cached on disk, see :mod:`s2stools.cache`.
     """
 
-    result = pd.read_html(
-        "https://csl.noaa.gov/groups/csl8/sswcompendium/majorevents.html"
-    )
+    dates = _ssw_compendium_dates().sel(dataset=column, drop=True)
+    return dates.to_series().dropna().rename(column)
+
+
+@cached("ssw_compendium", source=SSW_COMPENDIUM_URL)
+def _ssw_compendium_dates():
+    # dates of all columns (datasets) of the compendium table, NaT where there is no date
+    result = pd.read_html(io.StringIO(fetch_bytes(SSW_COMPENDIUM_URL).decode()))
     df_raw = result[0]
 
     # parse dates
@@ -379,14 +1496,141 @@ def ssw_compendium_event_dates(column="ERA-Interim"):
             x = x.replace(year=x.year - 100) if x.year > datetime.now().year else x
             return x
         else:
-            return x
+            return pd.NaT
+
+    df = df_raw.apply(lambda column: column.map(parse_dates))
+    df.columns = [str(c) for c in df.columns]
+    df.index.name = "event"
+
+    return xr.DataArray(
+        df.to_numpy(dtype="datetime64[ns]"),
+        dims=["event", "dataset"],
+        coords=dict(event=df.index.values, dataset=df.columns.values),
+        name="ssw_date",
+    )
+
 
-    df = df_raw.applymap(parse_dates)
+def contingency(
+    forecast_events,
+    observed_dates,
+    tolerance_days=0,
+    by=("leadtime_bin",),
+    forecasts=None,
+    leadtime_bins=(0, 7, 14, 21, 28, 35, 42, 49),
+):
+    """
+    Contingency table and scores of event forecasts, verified against observed event dates.
 
-    # filter for valid dates
-    dates = df[column][df[column].apply(lambda x: isinstance(x, pd.Timestamp))]
+    Every forecast member and leadtime bin is one yes/no forecast: *yes* if the member has an event with a leadtime
+    in the bin. It is verified as observed if an observed event falls into the validtimes of the bin, widened by
+    `tolerance_days` on both sides. The observed dates are sorted once and matched to all windows with
+    ``np.searchsorted``.
 
-    return dates
+    Parameters
+    ----------
+    forecast_events : list or EventTable
+        forecast events, e.g. from :func:`find_ssw`
+    observed_dates : array-like
+        dates of the observed events, e.g. from :func:`ssw_compendium_event_dates`
+    tolerance_days : int
+        allowed timing error in days. Defaults to 0.
+    by : list
+        dimensions to keep, any of ``"leadtime_bin"``, ``"reftime"``, ``"hc_year"``. Defaults to
+        ``("leadtime_bin",)``.
+    forecasts : xr.DataArray
+        data from which the events were detected, with dimensions `reftime`, `hc_year`, `number`; members with data
+        are the forecasts to verify. If None, all combinations of reftime, hc_year and number of the events are
+        used, which misses forecasts without any event. Defaults to None.
+    leadtime_bins : list
+        bin edges in days, bins include the left edge. Defaults to weekly bins.
+
+    Returns
+    -------
+    xr.Dataset
+        ``hits``, ``misses``, ``false_alarms``, ``correct_negatives``, probability of detection ``pod``, false
+        alarm ratio ``far`` and ``brier`` score of the ensemble probability (fraction of members with an event)
+
+    Examples
+    --------
+    >>> ssws = find_ssw(u60)
+    >>> observed = ssw_compendium_event_dates()
+    >>> scores = contingency(ssws, observed, tolerance_days=3, forecasts=u60)
+    >>> scores.pod.plot()
+    """
+    events = (
+        forecast_events
+        if isinstance(forecast_events, EventTable)
+        else EventTable.from_list(forecast_events)
+    )
+    fc_dims = ["reftime", "hc_year", "number"]
+    if forecasts is None:
+        coords = {d: np.unique(events[d]) for d in fc_dims}
+        valid = np.ones([len(c) for c in coords.values()], dtype=bool)
+    else:
+        other_dims = [d for d in forecasts.dims if d not in fc_dims]
+        valid_da = forecasts.notnull().any(other_dims).transpose(*fc_dims)
+        coords = {d: valid_da[d].values for d in fc_dims}
+        valid = valid_da.values
+
+    bins = np.asarray(leadtime_bins).astype("timedelta64[D]")
+    n_bins = len(bins) - 1
+
+    # forecast yes: any event of the member in the bin
+    pos = [pd.Index(coords[d]).get_indexer(events[d]) for d in fc_dims]
+    b = np.searchsorted(bins, events.leadtime, side="right") - 1
+    inside = np.all([p >= 0 for p in pos], axis=0) & (b >= 0) & (b < n_bins)
+    fc_yes = np.zeros(valid.shape + (n_bins,), dtype=bool)
+    fc_yes[pos[0][inside], pos[1][inside], pos[2][inside], b[inside]] = True
+
+    # observed yes: any observed event within the (widened) validtimes of the bin
+    observed = np.sort(
+        pd.to_datetime(np.atleast_1d(observed_dates)).values.astype("datetime64[D]")
+    )
+    # one hc_year at a time, add_years treats a single pair of reftime and years as scalar
+    init = np.stack(
+        [
+            pd.to_datetime(np.atleast_1d(add_years(coords["reftime"], int(h)))).values
+            for h in coords["hc_year"]
+        ],
+        axis=1,
+    ).astype("datetime64[D]")
+    tolerance = np.timedelta64(tolerance_days, "D")
+    start = init[..., None] + bins[:-1] - tolerance
+    end = init[..., None] + bins[1:] - np.timedelta64(1, "D") + tolerance
+    obs_yes = np.searchsorted(observed, end, side="right") > np.searchsorted(
+        observed, start, side="left"
+    )
+
+    dims = fc_dims + ["leadtime_bin"]
+    coords["leadtime_bin"] = [
+        f"{lo.astype(int)}-{hi.astype(int)}D" for lo, hi in zip(bins[:-1], bins[1:])
+    ]
+    fc_yes = xr.DataArray(fc_yes, dims=dims, coords=coords)
+    obs_yes = xr.DataArray(
+        obs_yes,
+        dims=["reftime", "hc_year", "leadtime_bin"],
+        coords={d: coords[d] for d in ["reftime", "hc_year", "leadtime_bin"]},
+    )
+    valid = xr.DataArray(valid, dims=fc_dims, coords={d: coords[d] for d in fc_dims})
+
+    reduce_dims = [d for d in dims if d not in by]
+    table = xr.Dataset(
+        dict(
+            hits=fc_yes & obs_yes & valid,
+            misses=~fc_yes & obs_yes & valid,
+            false_alarms=fc_yes & ~obs_yes & valid,
+            correct_negatives=~fc_yes & ~obs_yes & valid,
+        )
+    ).sum(reduce_dims)
+    table["pod"] = table.hits / (table.hits + table.misses)
+    table["far"] = table.false_alarms / (table.hits + table.false_alarms)
+
+    # ensemble probability per forecast (reftime, hc_year) and bin
+    n_members = valid.sum("number")
+    probability = (fc_yes & valid).sum("number") / n_members
+    squared_error = ((probability - obs_yes) ** 2).where(n_members > 0)
+    table["brier"] = squared_error.mean([d for d in reduce_dims if d != "number"])
+    return table
 
 
 def extreme_predictors(data_comp):
@@ -397,37 +1641,68 @@ def extreme_predictors(data_comp):
 
     Returns:
         xr.Dataset: Dataset with dimension "days_since_event"
+
+    See Also:
+        :func:`exceedance_fractions`
     """
+    fractions = exceedance_fractions(
+        data_comp.nam1000, [("<", -3), ("<", 0), (">", 3)]
+    ).compute()
 
-    predictor_fractions_m2 = []
-    predictor_fractions_m0 = []
-    predictor_fractions_p2 = []
+    return xr.Dataset(
+        data_vars={
+            "extremors_nam1000_m2": fractions.isel(threshold=0, drop=True),
+            "extremors_nam1000_m0": fractions.isel(threshold=1, drop=True),
+            "extremors_nam1000_p2": fractions.isel(threshold=2, drop=True),
+        },
+    )
 
-    for d in data_comp.days_since_event:
-        data_sel = data_comp.nam1000.sel(days_since_event=d).compute()
 
-        data_sel_extr = data_sel.where(data_sel < -3, drop=True)
-        fraction = len(data_sel_extr.i) / len(data_sel.dropna("i").i)
-        predictor_fractions_m2.append(fraction)
+def exceedance_fractions(data_comp, thresholds, dim="i"):
+    """
+    Fraction of events beyond each of the thresholds, among the events with data.
 
-        data_sel_extr = data_sel.where(data_sel < 0, drop=True)
-        fraction = len(data_sel_extr.i) / len(data_sel.dropna("i").i)
-        predictor_fractions_m0.append(fraction)
+    All thresholds are evaluated at once along a new dimension ``threshold`` and reduced over `dim` in a single
+    pass, lazily if the composite is a dask array.
 
-        data_sel_extr = data_sel.where(data_sel > 3, drop=True)
-        fraction = len(data_sel_extr.i) / len(data_sel.dropna("i").i)
-        predictor_fractions_p2.append(fraction)
+    Parameters
+    ----------
+    data_comp : xr.Dataset or xr.DataArray
+        composite, e.g. :attr:`EventComposite.comp`
+    thresholds : list
+        pairs of direction (``"<"`` or ``">"``) and threshold value, e.g. ``[("<", -3), ("<", 0), (">", 3)]``
+    dim : str
+        dimension to reduce over. Defaults to ``"i"``.
 
-    return xr.Dataset(
-        data_vars={
-            "extremors_nam1000_m2": ("days_since_event", predictor_fractions_m2),
-            "extremors_nam1000_m0": ("days_since_event", predictor_fractions_m0),
-            "extremors_nam1000_p2": ("days_since_event", predictor_fractions_p2),
-        },
-        coords={
-            "days_since_event": ("days_since_event", data_comp.days_since_event.values)
-        },
+    Returns
+    -------
+    xr.Dataset or xr.DataArray
+        fractions with additional dimension ``threshold`` (labels such as ``"<-3"``) and coordinates
+        ``direction`` and ``threshold_value``
+
+    Examples
+    --------
+    >>> fractions = exceedance_fractions(ssw_composite.comp[["nam1000", "nam100"]], [("<", -3), (">", 3)])
+    >>> fractions.nam1000.sel(threshold="<-3")
+    """
+    directions, values = zip(*thresholds)
+    if not set(directions).issubset({"<", ">"}):
+        raise ValueError(f"directions must be one of '<', '>' (got {directions})")
+    labels = [f"{d}{v:g}" for d, v in thresholds]
+    coords = dict(
+        threshold=labels,
+        direction=("threshold", list(directions)),
+        threshold_value=("threshold", list(values)),
     )
+    value = xr.DataArray(list(values), dims="threshold", coords=coords)
+    # x < value is -(x - value) > 0
+    sign = xr.DataArray(
+        [-1 if d == "<" else 1 for d in directions], dims="threshold", coords=coords
+    )
+
+    n_exceed = ((data_comp - value) * sign > 0).sum(dim)
+    n_valid = data_comp.notnull().sum(dim)
+    return n_exceed / n_valid
 
 
 #### EXTREME PROBABILITIES
@@ -440,9 +1715,16 @@ def prob_oneday_extreme_nam_within_period_clim(
     n_bootstrap_samples=1_000,
     uncertainty_percentiles=[0.025, 0.975],
     max_days=None,
+    seed=None,
+    batch_size=1_000,
+    n_workers=None,
+    executor="thread",
 ):
     """Compute climatological probability of at least 1 day below threshold as function of waiting period.
 
+    Replicates are drawn in batches of `batch_size` as in :func:`bootstrap_extr_prob`, so that memory is bounded by
+    one batch per worker and results do not depend on `n_workers`.
+
     Args:
         nam_data (DataArray): data of S2S model (not stacked)
         extreme_threshold (float): threshold
@@ -450,6 +1732,10 @@ def prob_oneday_extreme_nam_within_period_clim(
         n_bootstrap_samples (int, optional): how many times to repeat drwaing estimates. Defaults to 1_000.
         uncertainty_percentiles (list, optional): Confidence Interval. Defaults to [0.025, 0.975].
         max_days (int, optional): How many days for climatology computation, if None than =len(days_since_init). Defaults to None.
+        seed (int, optional): seed for the random resampling. Defaults to None.
+        batch_size (int, optional): number of replicates drawn at once. Defaults to 1_000.
+        n_workers (int, optional): number of parallel workers for the batches. Defaults to None (no pool).
+        executor (str, optional): one of "thread", "process". Defaults to "thread".
 
     Returns:
         DataArray: coords are {"stat": ["mean", "uncertainty_top", "uncertainty_bottom"], "days": <day_list>}
@@ -459,31 +1745,47 @@ def prob_oneday_extreme_nam_within_period_clim(
     if not max_days:
         max_days = len(nam_data.days_since_init)  # 35
 
-    # iterate over period lengths
-
-    mean = []
-    uncertainty_top = []
-    uncertainty_bottom = []
-    for pl in tqdm(range(max_days), desc="p clim iterating period lengths"):
-        # compute climatological mean and CI for p between 1 and i
-        pop_mean, pop_ci = bootstrap_extr_prob(
-            population=nam_data.stack(fc=("reftime", "hc_year", "number")).dropna(
-                "fc", how="all"
-            ),
-            sample_size=bootstrap_sample_size,  # len(ssw.comp.i),
-            dsi_slice=slice(dsi_start, dsi_start + pl),
-            threshold=extreme_threshold,
-            n_bootstrap_samples=n_bootstrap_samples,
+    # stack and convert the population once
+    population = (
+        nam_data.stack(fc=("reftime", "hc_year", "number"))
+        .dropna("fc", how="all")
+        .sel(days_since_init=slice(dsi_start, None))
+        .transpose("fc", "days_since_init")
+    )
+    if extreme_threshold <= 0:
+        is_extreme = population.values < extreme_threshold
+    else:
+        is_extreme = population.values > extreme_threshold
+    # extreme on at least one day between dsi_start and each day
+    extreme_within = np.maximum.accumulate(is_extreme, axis=1)
+    # period length pl covers days_since_init dsi_start, ..., dsi_start + pl
+    day_idx = (
+        np.searchsorted(
+            population.days_since_init.values,
+            dsi_start + np.arange(max_days),
+            side="right",
         )
-        mean.append(pop_mean)
-        uncertainty_bottom.append(pop_ci[0])
-        uncertainty_top.append(pop_ci[1])
+        - 1
+    )
+    extreme_within = extreme_within[:, day_idx]
+
+    # each batch of replicates covers all period lengths at once
+    p_extremes = _bootstrap_batches(
+        extreme_within,
+        bootstrap_sample_size,
+        n_bootstrap_samples,
+        seed,
+        batch_size,
+        n_workers,
+        executor,
+    ).T  # shape (period length, bootstrap sample)
+
+    mean = p_extremes.mean(axis=1)
+    uncertainty_bottom, uncertainty_top = np.quantile(
+        p_extremes, uncertainty_percentiles, axis=1
+    )
 
     pos_lag_days = np.arange(1, max_days + 1)
-    mean = np.array(mean)
-    uncertainty_bottom = np.array(uncertainty_bottom)
-    uncertainty_top = np.array(uncertainty_top)
-
     res = xr.DataArray(
         np.array([mean, uncertainty_top, uncertainty_bottom]),
         dims=["stat", "days"],
@@ -498,6 +1800,9 @@ def prob_oneday_extreme_nam_within_period_clim(
 def prob_oneday_extreme_nam_within_period_after_event(nam_comp, extreme_threshold):
     """Compute probability for at least 1 day nam < extreme_threshold within period.
 
+    The first exceedance day of every composite member is found once, the probability for all period lengths
+    follows from the cumulative product of the daily hazards.
+
     Args:
         nam_comp (DataArray): comp with dims=['days_since_event', 'i']
         extreme_threshold (float): threshold
@@ -506,26 +1811,54 @@ def prob_oneday_extreme_nam_within_period_after_event(nam_comp, extreme_threshol
         DataArray: probability with variable 'days' which is the period length
     """
 
-    period_length = len(nam_comp.sel(days_since_event=slice(1, None)).days_since_event)
-
-    p = []
-    for i in tqdm(range(period_length), desc="p clim iterating period lengths"):
-        p_within_i_days_after_event = integrated_extr_prob(
-            data=nam_comp, dse_slice=slice(1, 1 + i), threshold=extreme_threshold
-        )
-        p.append(p_within_i_days_after_event)
-
-    pos_lag_days = np.arange(1, period_length + 1)
-    p = np.array(p)
+    hazard = _extr_hazard(
+        nam_comp.sel(days_since_event=slice(1, None)), extreme_threshold
+    )
+    p = 1 - np.cumprod(1 - hazard)
+    pos_lag_days = np.arange(1, len(p) + 1)
     res = xr.DataArray(p, dims=["days"], coords={"days": pos_lag_days})
     return res
 
 
+def _extr_hazard(data, threshold):
+    """
+    Conditional probability per day that a member is extreme for the first time, given that it has not been
+    extreme before (among the members with data on that day).
+
+    Args:
+        data (DataArray): composite with dimensions i and days_since_event
+        threshold (float): definition of extreme, below if <= 0, otherwise above
+
+    Returns:
+        np.ndarray: hazard for each day
+    """
+    values = data.transpose("i", "days_since_event").values
+    extreme = values < threshold if threshold <= 0 else values > threshold
+    n_days = values.shape[1]
+    # first exceedance day of each member, n_days if never extreme
+    first = np.where(extreme.any(axis=1), extreme.argmax(axis=1), n_days)
+    new_extremes = np.bincount(first, minlength=n_days + 1)[:n_days]
+    at_risk = (~np.isnan(values) & (first[:, None] >= np.arange(n_days))).sum(axis=0)
+    return np.divide(new_extremes, at_risk, out=np.zeros(n_days), where=at_risk > 0)
+
+
 def bootstrap_extr_prob(
-    population, sample_size, dsi_slice, threshold, alpha=0.05, n_bootstrap_samples=1_000
+    population,
+    sample_size,
+    dsi_slice,
+    threshold,
+    alpha=0.05,
+    n_bootstrap_samples=1_000,
+    seed=None,
+    batch_size=1_000,
+    n_workers=None,
+    executor="thread",
 ):
     """Bootstrapping forecasts to compute mean and confidence interval for probability that NAM is below threshold.
 
+    Replicates are drawn in batches of `batch_size`, each batch with its own random generator spawned from `seed`,
+    so that memory is bounded by one batch per worker and results do not depend on `n_workers`.
+
     Args:
         population (DataArray): dimensions 'fc' and 'days_since_init'
         sample_size (int): size of one sample that is bootstrapped
@@ -533,45 +1866,64 @@ def bootstrap_extr_prob(
         threshold (int): NAM below which threshold?
         alpha (float, optional): alpha-level for confidence interval. Defaults to 0.05.
         n_bootstrap_samples (int, optional): times to repeat drawing samples from the population. Defaults to 1_000.
+        seed (int, optional): seed for the random resampling. Defaults to None.
+        batch_size (int, optional): number of replicates drawn at once. Defaults to 1_000.
+        n_workers (int, optional): number of parallel workers for the batches. Defaults to None (no pool).
+        executor (str, optional): one of "thread", "process". Defaults to "thread".
 
     Returns:
         (float, (float, float)): (mean, (CI_bottom, CI_top))
     """
 
-    population_dsi_sliced = population.sel(days_since_init=dsi_slice)
-    population_dsi_sliced_vals = population_dsi_sliced.values
-    rand_fc_idx = np.random.randint(
-        low=0, high=len(population.fc), size=sample_size * n_bootstrap_samples
+    population_dsi_sliced = population.sel(days_since_init=dsi_slice).transpose(
+        "fc", "days_since_init"
     )
-    n_dsi = len(population_dsi_sliced.days_since_init)
-    population_dsi_sliced_vals_reshaped = population_dsi_sliced_vals[
-        :, rand_fc_idx
-    ].reshape(n_dsi, sample_size, n_bootstrap_samples)
-
     if threshold <= 0:
-        is_extreme = (population_dsi_sliced_vals_reshaped < threshold).max(
-            axis=0
-        )  # is extreme on at least one day
+        is_extreme = population_dsi_sliced.values < threshold
     else:
-        is_extreme = (population_dsi_sliced_vals_reshaped > threshold).max(
-            axis=0
-        )  # is extreme on at least one day
-    n_extremes = is_extreme.sum(axis=0)  # sum over forecasts
-    p_extremes = n_extremes / sample_size  # divide by sample size
-    p_extremes_list = p_extremes.tolist()  # list to determine mean/ CI/...
-
-    def empirical_cdf(array):
-        N = len(array)
-        x = np.sort(array)
-        cdf = np.arange(N) / N
-        return x, cdf
-
-    x, cdf = empirical_cdf(p_extremes_list)
-    test = np.argwhere((cdf > alpha / 2) & (cdf < 1 - alpha / 2))
-    idx_low, idx_high = np.argwhere((cdf > alpha / 2) & (cdf < 1 - alpha / 2))[[0, -1]]
-    ci = float(x[idx_low]), float(x[idx_high])
-    mean = np.mean(p_extremes_list)
-    return mean, ci
+        is_extreme = population_dsi_sliced.values > threshold
+    is_extreme = is_extreme.any(axis=1)  # is extreme on at least one day
+
+    p_extremes = _bootstrap_batches(
+        is_extreme,
+        sample_size,
+        n_bootstrap_samples,
+        seed,
+        batch_size,
+        n_workers,
+        executor,
+    )
+
+    ci = np.quantile(p_extremes, [alpha / 2, 1 - alpha / 2])
+    mean = p_extremes.mean()
+    return float(mean), (float(ci[0]), float(ci[1]))
+
+
+def _bootstrap_batches(
+    is_extreme, sample_size, n_samples, seed, batch_size, n_workers, executor
+):
+    # fraction of extreme forecasts in each replicate, the batches have their own generators spawned from seed
+    sizes = [
+        min(batch_size, n_samples - start) for start in range(0, n_samples, batch_size)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    return np.concatenate(
+        _map_batches(
+            _extr_prob_batch,
+            list(zip(seeds, sizes)),
+            n_workers=n_workers,
+            executor=executor,
+            shared=dict(is_extreme=is_extreme, sample_size=sample_size),
+        )
+    )
+
+
+def _extr_prob_batch(batch, is_extreme, sample_size):
+    # fraction of extreme forecasts (along the first axis) in each of the replicates of one batch
+    seed, n = batch
+    rng = np.random.default_rng(seed)
+    rand_fc_idx = rng.integers(0, len(is_extreme), size=(n, sample_size))
+    return is_extreme[rand_fc_idx].mean(axis=1)
 
 
 # used for p after event
@@ -588,40 +1940,5 @@ def integrated_extr_prob(data, dse_slice, threshold):
 
     :noindex:
     """
-    # data_stacked_ssw = ssw.comp.rename(i="fc").nam1000
-    data = data.rename(i="fc")
-
-    n = []
-    fc_to_exclude = []
-    for dse in data.sel(days_since_event=dse_slice).days_since_event:
-        if threshold <= 0:
-            fc_extr = (
-                data.sel(days_since_event=dse)
-                .where(data.sel(days_since_event=dse) < threshold, drop=True)
-                .fc
-            )
-        else:
-            fc_extr = (
-                data.sel(days_since_event=dse)
-                .where(data.sel(days_since_event=dse) > threshold, drop=True)
-                .fc
-            )
-        n_fc_extr = len(fc_extr)
-        n_fc_to_exclude = len(fc_to_exclude)
-        new_fc_extr = list(set(fc_extr.values) - set(fc_to_exclude))
-        normalization = len(
-            data.sel(
-                days_since_event=dse,
-                fc=np.isin(
-                    data.sel(days_since_event=dse).fc, fc_to_exclude, invert=True
-                ),
-            )
-            .dropna("fc")
-            .fc
-        )
-        p = 0 if normalization == 0 else len(new_fc_extr) / normalization
-        n.append(p)
-        fc_to_exclude.extend(fc_extr.values)
-        fc_to_exclude = list(set(fc_to_exclude))  # new
-
-    return 1 - np.prod(1 - np.array(n))
+    hazard = _extr_hazard(data.sel(days_since_event=dse_slice), threshold)
+    return 1 - np.prod(1 - hazard)
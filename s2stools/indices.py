@@ -1,7 +1,35 @@
+import functools
+import glob
+import io
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+import dask
+import dask.array
 import numpy as np
-import pandas as pd
 import xarray as xr
 
+from s2stools.cache import (
+    _is_url,
+    cached,
+    fetch_bytes,
+    open_remote_dataset,
+    resolve_url,
+)
+
+MJO_URLS = dict(
+    amplitude="http://iridl.ldeo.columbia.edu/SOURCES/.BoM/.MJO/.RMM/.amplitude/dods",
+    phase="http://iridl.ldeo.columbia.edu/SOURCES/.BoM/.MJO/.RMM/.phase/dods",
+)
+ENSO_URL = "https://psl.noaa.gov/gcos_wgsp/Timeseries/Data/nino34.long.anom.data"
+QBO_URL = "https://www.geo.fu-berlin.de/met/ag/strat/produkte/qbo/qbo.dat"
+NAO_URL = (
+    "https://ftp.cpc.ncep.noaa.gov/cwlinks/norm.daily.nao.index.b500101.current.ascii"
+)
+
 
 def download_mjo():
     """
@@ -11,32 +39,44 @@ def download_mjo():
     -------
     da_phase, da_phase : [xr.DataArray, xr.DataArray]
         Madden Julian Oscillation Realtime Multivariate Index: Phase, Amplitude
+
+    Notes
+    -----
+    Results are cached on disk, see :mod:`s2stools.cache`.
     """
     try:
-        import pydap
+        return _download_mjo()
     except ImportError:
         print(
             "MJO download requires package pydap, which is not installed. Consider: pip install pydap"
         )
         return xr.DataArray(name="mjo_phase"), xr.DataArray(name="mjo_mag")
-    else:
-        path_amplitude = (
-            "http://iridl.ldeo.columbia.edu/SOURCES/.BoM/.MJO/.RMM/.amplitude/dods"
-        )
-        da_amplitude = xr.open_dataset(path_amplitude).amplitude.rename("mjo_mag")
 
-        path_phase = "http://iridl.ldeo.columbia.edu/SOURCES/.BoM/.MJO/.RMM/.phase/dods"
-        da_phase = xr.open_dataset(path_phase).phase.rename("mjo_phase")
 
-        def time_coordinates(dataarray):
-            julian_days = dataarray["T"].values.astype("int").astype("timedelta64[D]")
-            base_date = np.datetime64("-4713-11-24")  # julian calendar
-            dates = base_date + julian_days
-            return dataarray.rename(T="time").assign_coords(
-                time=dates.astype("timedelta64[ns]")
-            )
+@cached("mjo", source=MJO_URLS["phase"])
+def _download_mjo():
+    if _is_url(resolve_url(MJO_URLS["amplitude"])):
+        # OPeNDAP access, raises ImportError
+        import pydap
+
+    # both datasets are fetched at the same time
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        ds_amplitude, ds_phase = executor.map(
+            lambda url: open_remote_dataset(url).load(),
+            [MJO_URLS["amplitude"], MJO_URLS["phase"]],
+        )
+    da_amplitude = ds_amplitude.amplitude.rename("mjo_mag")
+    da_phase = ds_phase.phase.rename("mjo_phase")
 
-        return [time_coordinates(da) for da in [da_phase, da_amplitude]]
+    def time_coordinates(dataarray):
+        julian_days = dataarray["T"].values.astype("int").astype("timedelta64[D]")
+        base_date = np.datetime64("-4713-11-24")  # julian calendar
+        dates = base_date + julian_days
+        return dataarray.rename(T="time").assign_coords(
+            time=dates.astype("datetime64[ns]")
+        )
+
+    return [time_coordinates(da) for da in [da_phase, da_amplitude]]
 
 
 def download_enso(interp_daily=False) -> xr.Dataset:
@@ -52,33 +92,55 @@ def download_enso(interp_daily=False) -> xr.Dataset:
     -------
     da : xr.DataArray
         El Nino Southern Oscillation 3.4 index
-    """
-    url = "https://psl.noaa.gov/gcos_wgsp/Timeseries/Data/nino34.long.anom.data"
 
-    df = pd.read_table(
-        url,
-        skiprows=1,
-        sep=r"\s+",
-        names=["year"] + list(np.arange(1, 13)),
-        skipfooter=7,
-        engine="python",
-        na_values=-99.99,
-    )
-    df2 = df.melt(var_name="month", value_name="enso", id_vars="year")
-    df2["time"] = pd.to_datetime(
-        df2["year"].astype(str) + "-" + df2["month"].astype("str")
-    )
-    df2.set_index("time", inplace=True)
-    df2.drop(columns=["year", "month"], inplace=True)
-    df2.sort_index(inplace=True)
-    enso = df2.squeeze()
-    enso_xr = enso.to_xarray()
+    Notes
+    -----
+    Results are cached on disk, see :mod:`s2stools.cache`.
+    """
+    enso_xr = _download_enso()
 
     if interp_daily:
         enso_xr = enso_xr.resample(time="1d").interpolate(kind="linear").dropna("time")
     return enso_xr
 
 
+@cached("enso", source=ENSO_URL)
+def _download_enso():
+    return _parse_enso(fetch_bytes(ENSO_URL))
+
+
+def _parse_enso(content):
+    # header line: first and last year, followed by one row per year (year, 12 months) and a footer
+    lines = content.splitlines()
+    first_year, last_year = [int(year) for year in lines[0].split()[:2]]
+    n_years = last_year - first_year + 1
+    table = _parse_table(b"\n".join(lines[1 : n_years + 1]), n_columns=13)
+    values = table[:, 1:].ravel()
+    values[values == -99.99] = np.nan
+    time = _monthly_dates(
+        np.repeat(table[:, 0], 12), np.tile(np.arange(1, 13), len(table))
+    )
+    return xr.DataArray(values, coords=dict(time=time), dims="time", name="enso")
+
+
+def _parse_table(content, n_columns):
+    # whitespace separated numbers, rows with missing values are dropped
+    try:
+        return np.loadtxt(io.BytesIO(content), ndmin=2, usecols=range(n_columns))
+    except (ValueError, IndexError):
+        pass
+    rows = [line.split() for line in content.splitlines()]
+    return np.array([row for row in rows if len(row) == n_columns], dtype=float)
+
+
+def _monthly_dates(year, month, day=1):
+    months = (
+        (np.asarray(year, dtype=int) - 1970) * 12 + np.asarray(month, dtype=int) - 1
+    )
+    dates = months.astype("datetime64[M]").astype("datetime64[D]")
+    return (dates + (np.asarray(day, dtype=int) - 1)).astype("datetime64[ns]")
+
+
 def get_qbo():
     """
     Backward compatibility for download_qbo
@@ -109,54 +171,133 @@ def download_qbo():
     See Also
     --------
     :func:`download_mjo`, :func:`download_enso`
+
+    Notes
+    -----
+    Results are cached on disk, see :mod:`s2stools.cache`.
     """
-    path = "https://www.geo.fu-berlin.de/met/ag/strat/produkte/qbo/qbo.dat"
-    # dateparse = lambda x: datetime.strptime(x, "%y%m")
-    qbo = pd.read_table(
-        path,
-        skiprows=381,
-        sep=r"\s+",
-        index_col=0,
-        usecols=range(1, 9),
-        names=[
-            "IIIII",
-            "time",
-            "70hPa",
-            "50hPa",
-            "40hPa",
-            "30hPa",
-            "20hPa",
-            "15hPa",
-            "10hPa",
-        ],
-        # date_parser=dateparse,
-        date_format="%y%m",
-        parse_dates=[0],
-    )
-    qbo_xr = qbo.to_xarray().to_array("p")
-    # assign pressure coordinates and attributes
+    return _download_qbo()
+
+
+@cached("qbo", source=QBO_URL)
+def _download_qbo():
+    return _parse_qbo(fetch_bytes(QBO_URL))
+
+
+def _parse_qbo(content):
+    # 381 header lines, then rows of station, YYMM and the wind at 7 levels in dm/s
+    levels = [70, 50, 40, 30, 20, 15, 10]
+    table = _parse_table(content.split(b"\n", 381)[-1], n_columns=9)
+    yymm = table[:, 1].astype(int)
+    # two-digit years as in strptime("%y"): 69-99 -> 19xx, 00-68 -> 20xx
+    year = yymm // 100 + np.where(yymm // 100 < 69, 2000, 1900)
     # divide by 10 to get m/s instead of dm/s
-    data = (
-        (qbo_xr / 10)
-        .assign_coords(p=[int(str(p[:-3])) for p in qbo_xr.p.values])
-        .rename("u")
-        .assign_attrs(units="m/s")
+    data = xr.DataArray(
+        table[:, 2:].T / 10,
+        coords=dict(p=levels, time=_monthly_dates(year, yymm % 100)),
+        dims=["p", "time"],
+        name="u",
+        attrs=dict(units="m/s"),
     )
     data["p"] = data.p.assign_attrs(units="hPa", long_name="pressure level")
 
     return data
 
 
-def download_indices(enso=True, mjo=True, u60=False, qbo=True):
+def load_u60_10hpa(era5_path, latitude=60, level=10, variable="u"):
+    """
+    Zonal-mean zonal wind at 60°N and 10 hPa (polar vortex strength) from local ERA5 files.
+
+    Only the latitude band and level are selected in each file before the zonal mean, so whole fields are never
+    loaded. The daily time series is cached on disk (see :mod:`s2stools.cache`) and in memory, such that repeated
+    calls are fast. Changes of the files (new files, modification times) are detected.
+
+    Parameters
+    ----------
+    era5_path : str or list
+        path, glob or list of ERA5 netCDF files with zonal wind on pressure levels (or a single level).
+    latitude : float
+        latitude, the nearest gridpoint is used. Defaults to 60.
+    level : float
+        pressure level in hPa, if the files have a level dimension. Defaults to 10.
+    variable : str
+        name of the zonal wind variable. Defaults to ``"u"``.
+
+    Returns
+    -------
+    u60 : xr.DataArray
+        daily zonal-mean zonal wind with dimension time.
+
+    Examples
+    --------
+    >>> u60 = s2stools.indices.load_u60_10hpa("/data/era5/u_*.nc")
+    """
+    files, mtimes = _era5_files(era5_path)
+    return _load_u60(files, mtimes, latitude, level, variable).copy()
+
+
+def _era5_files(era5_path):
+    # absolute file names and modification times, used as cache keys
+    files = sorted(glob.glob(era5_path)) if isinstance(era5_path, str) else era5_path
+    if len(files) == 0:
+        raise FileNotFoundError(f"no ERA5 files found: {era5_path}")
+    files = tuple(os.path.abspath(f) for f in files)
+    return files, tuple(os.path.getmtime(f) for f in files)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_u60(files, mtimes, latitude, level, variable):
+    # modification times are part of the key of both caches
+    return _load_u60_cached(list(files), list(mtimes), latitude, level, variable)
+
+
+@cached("u60")
+def _load_u60_cached(files, mtimes, latitude, level, variable):
+    preprocess = partial(
+        _select_zonal_mean, latitude=latitude, level=level, variable=variable
+    )
+    with xr.open_mfdataset(files, preprocess=preprocess, combine="by_coords") as ds:
+        u60 = ds[variable].resample(time="1D").mean().load()
+    return u60.rename("u60").assign_attrs(
+        long_name=f"zonal-mean zonal wind at {latitude}°N, {level} hPa",
+        units=ds[variable].attrs.get("units", "m s**-1"),
+    )
+
+
+def _select_zonal_mean(ds, latitude, level, variable):
+    # applied to every file before combining, only the selected band is read from disk
+    if "valid_time" in ds.dims:
+        ds = ds.rename(valid_time="time")
+    da = ds[variable].sel(latitude=latitude, method="nearest")
+    for level_dim in ("level", "pressure_level", "isobaricInhPa"):
+        if level_dim in da.dims:
+            da = da.sel({level_dim: level})
+    da = da.mean("longitude")
+    return da.drop_vars([c for c in da.coords if c != "time"]).to_dataset()
+
+
+def download_indices(
+    enso=True, mjo=True, u60=False, qbo=True, timeout=60, era5_path=None
+):
     """
     Download a couple of teleconnection indices.
 
+    The sources are fetched concurrently. Sources that fail or exceed their timeout are skipped with a warning, the
+    indices that succeeded are still returned. Complete results are cached, see :mod:`s2stools.cache`.
+
     Parameters
     ----------
     enso : bool
     mjo : bool
     u60 : bool
+        zonal-mean zonal wind at 60°N and 10 hPa, computed from local ERA5 files in `era5_path`.
     qbo : bool
+    timeout : float or dict
+        time in seconds to wait for each source, or a dict with one timeout per source (keys ``"enso"``,
+        ``"mjo"``, ``"qbo"``, ``"u60"``). Defaults to 60.
+    era5_path : str
+        path or glob of ERA5 files with zonal wind, required for `u60`, see :func:`load_u60_10hpa`.
+        Defaults to None.
 
     Returns
     -------
@@ -164,19 +305,77 @@ def download_indices(enso=True, mjo=True, u60=False, qbo=True):
 
     See Also
     --------
-    :func:`download_enso`, :func:`download_mjo`, :func:`download_mjo`
+    :func:`download_enso`, :func:`download_mjo`, :func:`download_qbo`, :func:`load_u60_10hpa`
     """
-    merge_list = []
-    if enso:
-        merge_list.append(download_enso(interp_daily=True))
-    if mjo:
-        merge_list += list(download_mjo())
-    if u60:
-        raise NotImplemented
-        # merge_list.append(load_u60_10hpa())
-    if qbo:
-        merge_list.append(download_qbo())
-    return xr.merge(merge_list, join="outer")
+    if u60 and era5_path is None:
+        raise ValueError("u60 is computed from local ERA5 files, specify era5_path")
+    sources = [
+        s
+        for s, flag in [("enso", enso), ("mjo", mjo), ("qbo", qbo), ("u60", u60)]
+        if flag
+    ]
+    u60_files, u60_mtimes = _era5_files(era5_path) if u60 else (None, None)
+    return _download_indices(
+        sources, u60_files=u60_files, u60_mtimes=u60_mtimes, timeout=timeout
+    )
+
+
+@cached(
+    "indices",
+    ignore=["timeout"],
+    condition=lambda ds: "failed_sources" not in ds.attrs,
+)
+def _download_indices(sources, u60_files=None, u60_mtimes=None, timeout=60):
+    # the modification times of the ERA5 files are part of the cache key
+    downloads = dict(
+        enso=partial(download_enso, interp_daily=True),
+        mjo=_download_mjo,
+        qbo=download_qbo,
+        u60=lambda: _load_u60(
+            tuple(u60_files or ()), tuple(u60_mtimes or ()), 60, 10, "u"
+        ).copy(),
+    )
+
+    timeouts = {
+        s: timeout.get(s, 60) if isinstance(timeout, dict) else timeout for s in sources
+    }
+    start = time.monotonic()
+    futures = {s: _run_in_daemon_thread(downloads[s]) for s in sources}
+    merge_list, failed = {}, []
+    # waiting in order of the deadlines, such that each source gets exactly its timeout
+    for s in sorted(sources, key=timeouts.get):
+        try:
+            result = futures[s].result(
+                timeout=max(0, timeouts[s] - (time.monotonic() - start))
+            )
+        except Exception as e:
+            print(
+                f"Warning: download of {s} failed ({type(e).__name__}: {e}), skipping"
+            )
+            failed.append(s)
+            continue
+        merge_list[s] = list(result) if isinstance(result, list) else [result]
+
+    ds = xr.merge(
+        [da for s in sources if s in merge_list for da in merge_list[s]], join="outer"
+    )
+    if failed:
+        ds.attrs["failed_sources"] = failed
+    return ds
+
+
+def _run_in_daemon_thread(func):
+    # downloads that timed out cannot be cancelled, daemon threads at least do not block interpreter exit
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
 
 
 def nao() -> xr.DataArray:
@@ -187,15 +386,215 @@ def nao() -> xr.DataArray:
     -------
     nao_index : xr.DataArray
 
+    Notes
+    -----
+    Results are cached on disk, see :mod:`s2stools.cache`.
+
     References
     -----
     https://ftp.cpc.ncep.noaa.gov/cwlinks/norm.daily.nao.index.b500101.current.ascii
     """
-    path = "https://ftp.cpc.ncep.noaa.gov/cwlinks/norm.daily.nao.index.b500101.current.ascii"
-    nao_index = pd.read_table(path, names=["year", "month", "day", "nao"], sep=r"\s+")
-    nao_index = nao_index[~np.isnan(nao_index.nao)]
-    nao_index["time"] = pd.to_datetime(nao_index[["year", "month", "day"]])
-    nao_index = nao_index.drop(columns=["year", "month", "day"])
-    nao_index = nao_index.set_index("time")
-    nao_index = nao_index.to_xarray()
-    return nao_index
+    return _download_nao()
+
+
+@cached("nao", source=NAO_URL)
+def _download_nao():
+    return _parse_nao(fetch_bytes(NAO_URL))
+
+
+def _parse_nao(content):
+    # rows of year, month, day and index value
+    table = _parse_table(content, n_columns=4)
+    table = table[~np.isnan(table[:, 3])]
+    time = _monthly_dates(table[:, 0], table[:, 1], table[:, 2])
+    return xr.Dataset(dict(nao=("time", table[:, 3])), coords=dict(time=time))
+
+
+def _spatial_weights(data, weights):
+    if weights is None:
+        return xr.DataArray(1.0)
+    if isinstance(weights, str) and weights == "coslat":
+        # exactly zero at the poles, not cos(pi/2) = 6e-17
+        return np.cos(np.deg2rad(data.latitude)).where(abs(data.latitude) < 90, 0)
+    return weights
+
+
+def _project(x, eofs, n_spatial):
+    # flatten the spatial dimensions once, then one matmul for all samples
+    x = x.reshape(x.shape[: x.ndim - n_spatial] + (-1,))
+    return x @ eofs.reshape(-1, eofs.shape[-1])
+
+
+def _project_dataarray(anoms, eofs, weights, mode_dim):
+    spatial_dims = [d for d in eofs.dims if d != mode_dim]
+    weighted_eofs = (eofs * _spatial_weights(eofs, weights)).fillna(0)
+    # gridpoints missing in all eofs (e.g. masked) do not contribute
+    missing = eofs.isnull().all(mode_dim)
+    if missing.any():
+        anoms = anoms.where(~missing, 0)
+    return xr.apply_ufunc(
+        _project,
+        anoms,
+        weighted_eofs.transpose(*spatial_dims, mode_dim),
+        kwargs=dict(n_spatial=len(spatial_dims)),
+        input_core_dims=[spatial_dims, spatial_dims + [mode_dim]],
+        output_core_dims=[[mode_dim]],
+        dask="parallelized",
+        output_dtypes=[np.float64],
+        dask_gufunc_kwargs=dict(allow_rechunk=True),
+    )
+
+
+def project(
+    forecast_anoms, eofs, weights="coslat", normalization=None, mode_dim="mode"
+):
+    """
+    Principal components of forecast anomalies: projection onto EOF patterns, e.g. for NAM, NAO or RMM indices.
+
+    The spatial dimensions are flattened once and all samples (reftime, hc_year, number, leadtime, ...) are projected
+    with a single matrix multiplication, blockwise for dask arrays. All other dimensions and coordinates of the
+    forecasts are kept, so realtime forecasts and hindcasts come out in the usual s2stools layout.
+
+    Parameters
+    ----------
+    forecast_anoms : xr.DataArray or xr.Dataset
+        anomalies with the spatial dimensions of `eofs`. For multivariate EOFs (e.g. OLR, u850 and u200 for RMM),
+        a Dataset with the same variables as `eofs`, each already scaled as in the EOF computation.
+    eofs : xr.DataArray or xr.Dataset
+        EOF patterns with dimension `mode_dim` and the spatial dimensions, e.g. from :func:`eofs`.
+        Gridpoints that are missing (NaN) in all patterns are ignored.
+    weights : str or xr.DataArray
+        weights of the gridpoints: ``"coslat"`` (cosine of latitude), a DataArray or None for no weighting.
+        Defaults to ``"coslat"``.
+    normalization : xr.DataArray
+        the principal components are divided by it, e.g. the standard deviation of the reanalysis principal
+        components along `mode_dim`. Defaults to None.
+    mode_dim : str
+        name of the mode dimension. Defaults to ``"mode"``.
+
+    Returns
+    -------
+    pc : xr.DataArray
+        principal components with the sample dimensions of `forecast_anoms` and `mode_dim`.
+
+    Notes
+    -----
+    The principal component of mode k is ``sum(forecast_anoms * weights * eofs[k])`` over the spatial dimensions,
+    consistent with the principal components of :func:`eofs` for the same weights.
+
+    Examples
+    --------
+    >>> nam = s2stools.indices.project(
+    >>>     s2s_z500_anoms, era5_z500_eofs, normalization=era5_pcs.std("time")
+    >>> ).sel(mode=0)
+    """
+    if isinstance(eofs, xr.Dataset):
+        pc = sum(
+            _project_dataarray(forecast_anoms[v], eofs[v], weights, mode_dim)
+            for v in eofs.data_vars
+        )
+    else:
+        pc = _project_dataarray(forecast_anoms, eofs, weights, mode_dim)
+    if mode_dim in eofs.coords:
+        pc = pc.assign_coords({mode_dim: eofs[mode_dim]})
+    if normalization is not None:
+        pc = pc / normalization
+    return pc.rename("pc")
+
+
+def eofs(
+    data,
+    n_modes,
+    weights="coslat",
+    sample_dims=None,
+    n_power_iter=2,
+    seed=None,
+):
+    """
+    Empirical orthogonal functions (EOFs) of anomalies, e.g. from reanalysis or hindcasts.
+
+    For dask arrays, a randomized SVD (:func:`dask.array.linalg.svd_compressed`) is computed chunk by chunk along the
+    samples, so memory is bounded by the chunk size and large archives (all hindcast years, members and days on a 1°
+    grid) can be used. For numpy arrays, the exact SVD is computed.
+
+    Parameters
+    ----------
+    data : xr.DataArray
+        anomalies. Missing values are treated as zero anomalies, they are not centered.
+    n_modes : int
+        number of leading modes.
+    weights : str or xr.DataArray
+        weights of the gridpoints: ``"coslat"`` (cosine of latitude), a DataArray or None for no weighting.
+        Defaults to ``"coslat"``.
+    sample_dims : list
+        dimensions that are stacked into samples, e.g. ``["reftime", "hc_year", "number", "leadtime"]``. The
+        remaining dimensions are the spatial dimensions. Defaults to all dimensions but latitude and longitude.
+    n_power_iter : int
+        number of power iterations of the randomized SVD, more iterations improve the accuracy. Defaults to 2.
+    seed : int
+        seed of the randomized SVD. Defaults to None.
+
+    Returns
+    -------
+    ds : xr.Dataset
+        with variables ``eofs`` (patterns with dimensions mode and the spatial dimensions), ``variance_fraction``
+        (fraction of total weighted variance explained by each mode) and ``pcs`` (principal components with the
+        sample dimensions and mode, lazy for dask input).
+
+    Notes
+    -----
+    The weighted anomalies ``data * sqrt(weights)`` are decomposed. The patterns are returned divided by
+    ``sqrt(weights)``, such that the principal components equal ``project(data, ds.eofs, weights)``, see
+    :func:`project`. Patterns are undefined (NaN) where the weights are zero or all samples are missing.
+    Signs are chosen such that the largest loading of each pattern is positive.
+
+    Examples
+    --------
+    >>> patterns = s2stools.indices.eofs(era5_z500_anoms.chunk(time=365), n_modes=1)
+    >>> nam = s2stools.indices.project(
+    >>>     s2s_z500_anoms, patterns.eofs, normalization=patterns.pcs.std("time")
+    >>> ).sel(mode=0)
+    """
+    if sample_dims is None:
+        sample_dims = [d for d in data.dims if d not in ("latitude", "longitude")]
+    spatial_dims = [d for d in data.dims if d not in sample_dims]
+    sqrt_weights = np.sqrt(_spatial_weights(data, weights))
+    missing = data.isnull().all(sample_dims)
+
+    x = (data * sqrt_weights).fillna(0).transpose(*sample_dims, *spatial_dims)
+    n_samples = int(np.prod([data.sizes[d] for d in sample_dims]))
+    n_space = int(np.prod([data.sizes[d] for d in spatial_dims]))
+    if isinstance(x.data, dask.array.Array):
+        # samples are split into chunks, the spatial dimensions are one chunk
+        x = x.chunk({d: -1 for d in spatial_dims})
+        matrix = x.data.reshape(n_samples, n_space)
+        _, sv, v = dask.array.linalg.svd_compressed(
+            matrix, k=n_modes, n_power_iter=n_power_iter, seed=seed
+        )
+        sv, v, total, missing = dask.compute(sv, v, (matrix**2).sum(), missing)
+    else:
+        matrix = x.values.reshape(n_samples, n_space)
+        _, sv, v = np.linalg.svd(matrix, full_matrices=False)
+        sv, v, total = sv[:n_modes], v[:n_modes], (matrix**2).sum()
+
+    # deterministic signs: largest loading positive
+    v = v * np.sign(v[np.arange(len(v)), np.abs(v).argmax(axis=1)])[:, None]
+    patterns = xr.DataArray(
+        v.reshape((len(v),) + tuple(data.sizes[d] for d in spatial_dims)),
+        dims=["mode"] + spatial_dims,
+        coords={
+            "mode": np.arange(len(v)),
+            **{d: data[d] for d in spatial_dims if d in data.coords},
+        },
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        patterns = (patterns / sqrt_weights).where((sqrt_weights > 0) & ~missing)
+
+    ds = xr.Dataset(
+        dict(
+            eofs=patterns,
+            variance_fraction=("mode", sv**2 / total),
+            pcs=project(data.fillna(0), patterns, weights=weights),
+        )
+    )
+    return ds
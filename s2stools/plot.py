@@ -5,6 +5,8 @@ import numpy as np
 import xarray as xr
 import matplotlib.patches as mpatches
 
+from s2stools.compute import ensemble_stats
+
 
 def xaxis_unit_days(ax=None, multiple=7, minor_multiple=1):
     """
@@ -157,12 +159,11 @@ def fill_between(dataarray, x, y, ax=None, ci=None, **kwargs):
     """
     x_vals = dataarray[x]
     if ci is None:
-        y1_vals = dataarray.min(y)
-        y2_vals = dataarray.max(y)
-        y_q = [y1_vals, y2_vals]
+        y_stats = ensemble_stats(dataarray, stats=["min", "max"], member_dim=y)
     else:
         assert len(ci) == 2, "ci must be a tuple consisting of two floats"
-        y_q = dataarray.quantile(q=ci, dim=y)
+        y_stats = ensemble_stats(dataarray, stats=[], q=ci, member_dim=y)
+    y_q = [y_stats.isel(stat=0), y_stats.isel(stat=1)]
     if ax is None:
         plt.fill_between(x_vals, *y_q, **kwargs)
     else:
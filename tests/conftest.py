@@ -0,0 +1,10 @@
+import pytest
+
+from s2stools import cache
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path):
+    # downloads in tests never read from or write to the user's cache
+    with cache.set_options(cache_dir=str(tmp_path / "s2stools_cache")):
+        yield
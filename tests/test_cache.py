@@ -0,0 +1,172 @@
+import functools
+import shutil
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from s2stools import cache
+from s2stools.events import ssw_compendium_event_dates
+from s2stools.indices import (
+    ENSO_URL,
+    download_enso,
+    download_indices,
+    download_mjo,
+    download_qbo,
+    nao,
+)
+from tests.utils import *
+
+
+@pytest.fixture
+def offline(tmp_path):
+    with cache.set_options(
+        mirror=MIRROR_PATH, cache_dir=str(tmp_path / "cache"), offline=True
+    ):
+        yield tmp_path
+
+
+def test_resolve_url():
+    with cache.set_options(mirror="/data/mirror"):
+        assert cache.resolve_url("https://psl.noaa.gov/a/b.data") == (
+            "/data/mirror/psl.noaa.gov/a/b.data"
+        )
+    with cache.set_options(mirror="http://localhost:8000/"):
+        assert cache.resolve_url("https://psl.noaa.gov/a/b.data") == (
+            "http://localhost:8000/psl.noaa.gov/a/b.data"
+        )
+    assert cache.resolve_url(ENSO_URL) == ENSO_URL
+    with pytest.raises(ValueError):
+        cache.set_options(not_an_option=True)
+
+
+def test_offline_without_mirror(tmp_path):
+    with cache.set_options(mirror=None, cache_dir=str(tmp_path), offline=True):
+        with pytest.raises(ConnectionError):
+            cache.fetch_bytes(ENSO_URL)
+        with pytest.raises(ConnectionError):
+            download_enso()
+
+
+def test_indices_from_mirror(offline):
+    enso = download_enso()
+    assert len(enso.time) == 36
+    assert np.isnan(enso.sel(time="2022-12")).all()
+    assert len(download_enso(interp_daily=True).time) > 900
+
+    qbo = download_qbo()
+    assert qbo.p.values.tolist() == [70, 50, 40, 30, 20, 15, 10]
+    assert qbo.time.values[0] == np.datetime64("2020-01-01")
+    assert qbo.attrs["units"] == "m/s"
+
+    assert len(nao().time) == 60
+
+    phase, amplitude = download_mjo()
+    assert phase.name == "mjo_phase" and amplitude.name == "mjo_mag"
+    assert phase.time.values[0] == np.datetime64("2020-01-01")
+
+    dates = ssw_compendium_event_dates()
+    assert dates.tolist() == list(
+        pd.to_datetime(["1979-02-22", "1980-02-29", "2018-02-12"])
+    )
+    assert len(ssw_compendium_event_dates("JRA-55")) == 3
+
+
+def test_cache_ttl(tmp_path):
+    mirror = tmp_path / "mirror"
+    shutil.copytree(MIRROR_PATH, mirror)
+    qbo_file = mirror / "www.geo.fu-berlin.de/met/ag/strat/produkte/qbo/qbo.dat"
+    with cache.set_options(mirror=str(mirror), cache_dir=str(tmp_path / "cache")):
+        first = download_qbo()
+        assert len(list((tmp_path / "cache").glob("qbo_*.nc"))) == 1
+        # the cached result is used while it is valid
+        qbo_file.write_text(qbo_file.read_text().replace("10001 2001", "10001 1901"))
+        assert (download_qbo() == first).all()
+        # expired: downloaded again
+        with cache.set_options(ttl=0):
+            assert download_qbo().time.values[0] == np.datetime64("2019-01-01")
+            # download fails: expired cache is used
+            with cache.set_options(mirror=str(tmp_path / "empty")):
+                assert download_qbo().time.values[0] == np.datetime64("2019-01-01")
+        cache.clear("qbo")
+        assert len(list((tmp_path / "cache").glob("qbo_*.nc"))) == 0
+
+
+def test_cache_roundtrip():
+    # DataArrays with different coordinates and missing values are restored exactly
+    time = pd.date_range("2020-01-01", periods=4)
+    result = [
+        xr.DataArray([1.0, np.nan, 3.0], coords=dict(time=time[:3]), name="a"),
+        xr.DataArray([np.nan, np.nan, 6.0], coords=dict(time=time[1:]), name="b"),
+    ]
+    calls = []
+
+    @cache.cached("roundtrip")
+    def download():
+        calls.append(1)
+        return result
+
+    download()
+    for cached, expected in zip(download(), result):
+        xr.testing.assert_identical(cached, expected)
+    assert len(calls) == 1
+
+
+class _SlowHandler(SimpleHTTPRequestHandler):
+    delay = 0.5
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_mirror(tmp_path):
+    handler = functools.partial(_SlowHandler, directory=MIRROR_PATH)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    with cache.set_options(
+        mirror=f"http://127.0.0.1:{server.server_port}",
+        cache_dir=str(tmp_path / "cache"),
+        offline=False,
+    ):
+        yield server
+    server.shutdown()
+
+
+def test_download_indices_concurrent(http_mirror, capsys):
+    # per-source timeout: qbo is skipped, the other indices are returned
+    ds = download_indices(mjo=False, timeout={"enso": 10, "qbo": 0.1})
+    assert "enso" in ds and "u" not in ds
+    assert "qbo" in capsys.readouterr().out
+    # let the skipped download finish, then start without cached sources
+    time.sleep(2 * _SlowHandler.delay)
+    cache.clear("enso")
+    cache.clear("qbo")
+
+    # enso and qbo are requested at the same time
+    start = time.monotonic()
+    complete = download_indices(mjo=False, timeout=10)
+    assert time.monotonic() - start < 2 * _SlowHandler.delay
+    assert "enso" in complete and "u" in complete
+    assert "failed_sources" not in complete.attrs
+
+    # mjo fails (OPeNDAP over http requires pydap), partial results are not memoized
+    ds = download_indices(timeout=10)
+    if "failed_sources" in ds.attrs:
+        assert ds.attrs["failed_sources"] == ["mjo"]
+        assert "enso" in ds and "u" in ds
+        assert len(list(Path(cache.OPTIONS["cache_dir"]).glob("indices_*"))) == 1
+
+    # complete result is served from the cache
+    with cache.set_options(offline=True, mirror=None):
+        xr.testing.assert_identical(download_indices(mjo=False), complete)
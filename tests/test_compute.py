@@ -0,0 +1,177 @@
+import pytest
+
+import numpy as np
+import scipy.stats
+import xarray as xr
+from s2stools.compute import (
+    css,
+    verify,
+    crps_ensemble,
+    bootstrap_verify,
+    flox_aggregations,
+    ensemble_stats,
+    ENSEMBLE_STATS,
+)
+
+
+def _dummy_fc_obs(seed=0):
+    rng = np.random.default_rng(seed)
+    obs = xr.DataArray(rng.normal(size=(40, 5)), dims=["fc", "latitude"])
+    fc = 0.7 * obs + xr.DataArray(
+        rng.normal(scale=0.5, size=(40, 5)), dims=["fc", "latitude"]
+    )
+    return fc, obs
+
+
+def test_verify():
+    fc, obs = _dummy_fc_obs()
+    scores = verify(fc, obs, dim="fc")
+
+    xr.testing.assert_allclose(scores.css, css(fc, obs, dim="fc"))
+    xr.testing.assert_allclose(scores.acc, xr.corr(fc, obs, dim="fc"))
+    xr.testing.assert_allclose(scores.rmse, np.sqrt(((fc - obs) ** 2).mean("fc")))
+    xr.testing.assert_allclose(scores.mae, np.abs(fc - obs).mean("fc"))
+    xr.testing.assert_allclose(scores.bias, fc.mean("fc") - obs.mean("fc"))
+    xr.testing.assert_allclose(scores.var_ratio, fc.var("fc") / obs.var("fc"))
+
+    # chunked along the verification dimension gives the same result
+    scores_dask = verify(fc.chunk(fc=7), obs.chunk(fc=7), dim="fc")
+    xr.testing.assert_allclose(scores_dask.compute(), scores)
+
+    # only pairs where both are valid are used
+    fc_nan = fc.where(fc.fc != 0)
+    scores_nan = verify(fc_nan, obs, dim="fc", metrics=["rmse"])
+    xr.testing.assert_allclose(
+        scores_nan.rmse, verify(fc[1:], obs[1:], dim="fc", metrics="rmse").rmse
+    )
+
+    # no cancellation for fields with a large mean (e.g. geopotential)
+    scores_offset = verify(fc + 1e8, obs + 1e8, dim="fc")
+    for m in ["acc", "rmse", "mae", "var_ratio"]:
+        xr.testing.assert_allclose(scores_offset[m], scores[m])
+    xr.testing.assert_allclose(scores_offset.bias, scores.bias, atol=1e-7)
+
+    with pytest.raises(ValueError):
+        verify(fc, obs, dim="fc", metrics=["not_a_metric"])
+
+
+def _crps_pairwise(x, y, fair=False):
+    x = x[~np.isnan(x)]
+    m = len(x)
+    pairs = np.abs(x[:, None] - x[None, :]).sum()
+    norm = 2 * m * (m - 1) if fair else 2 * m**2
+    return np.abs(x - y).mean() - pairs / norm
+
+
+def test_crps_ensemble():
+    rng = np.random.default_rng(1)
+    fc = xr.DataArray(rng.normal(size=(6, 11)), dims=["fc", "number"])
+    obs = xr.DataArray(rng.normal(size=6), dims=["fc"])
+    # second half of the forecasts has fewer members
+    fc[3:, 5:] = np.nan
+
+    for fair in [False, True]:
+        crps = crps_ensemble(fc, obs, fair=fair)
+        expected = [
+            _crps_pairwise(fc.values[k], obs.values[k], fair=fair) for k in range(6)
+        ]
+        np.testing.assert_allclose(crps.values, expected)
+        crps_dask = crps_ensemble(fc.chunk(fc=2), obs.chunk(fc=2), fair=fair)
+        np.testing.assert_allclose(crps_dask.values, expected)
+
+    # all members missing
+    fc[0] = np.nan
+    assert np.isnan(crps_ensemble(fc, obs)[0])
+
+
+def test_bootstrap_verify():
+    fc, obs = _dummy_fc_obs()
+    fc, obs = fc.rename(fc="reftime"), obs.rename(fc="reftime")
+
+    ci = bootstrap_verify(
+        fc, obs, dim="reftime", n_bootstrap=200, block_size=3, seed=0, batch_size=30
+    )
+    assert ci.rmse.dims == ("quantile", "latitude")
+    scores = verify(fc, obs, dim="reftime")
+    assert (ci.acc.isel(quantile=0) <= scores.acc).all()
+    assert (ci.acc.isel(quantile=1) >= scores.acc).all()
+
+    # reproducible and independent of batching and workers
+    ci2 = bootstrap_verify(
+        fc, obs, dim="reftime", n_bootstrap=200, block_size=3, seed=0, n_workers=2
+    )
+    xr.testing.assert_allclose(ci, ci2)
+
+    samples = bootstrap_verify(
+        fc, obs, metrics=["bias"], n_bootstrap=50, seed=1, return_samples=True
+    )
+    assert samples.bias.sizes["sample"] == 50
+
+
+def test_flox_aggregations():
+    flox_xarray = pytest.importorskip("flox.xarray")
+    rng = np.random.default_rng(2)
+    da = xr.DataArray(
+        rng.normal(size=(4, 35)),
+        dims=["x", "leadtime"],
+        coords={"week": ("leadtime", np.arange(35) // 7)},
+    )
+    da[0, 3] = np.nan
+    aggs = flox_aggregations(thresholds=[0.5])
+    weeks = da.values.reshape(4, 5, 7)
+
+    expected_var = da.groupby("week").var(ddof=1)
+    expected_fraction = (da > 0.5).groupby("week").sum() / da.notnull().groupby(
+        "week"
+    ).sum()
+    # numpy and chunked (tree-reduced) input
+    for d in [da, da.chunk(leadtime=5)]:
+        kwargs = dict(expected_groups=np.arange(5))
+        var = flox_xarray.xarray_reduce(
+            d, "week", func=aggs["sample_variance"], **kwargs
+        )
+        xr.testing.assert_allclose(var.compute(), expected_var.transpose(*var.dims))
+        fraction = flox_xarray.xarray_reduce(
+            d, "week", func=aggs["exceedance_fraction_0.5"], **kwargs
+        )
+        xr.testing.assert_allclose(
+            fraction.compute(), expected_fraction.transpose(*fraction.dims)
+        )
+        skew = flox_xarray.xarray_reduce(d, "week", func=aggs["skewness"], **kwargs)
+        np.testing.assert_allclose(
+            skew.compute().transpose("x", "week").values,
+            scipy.stats.skew(weeks, axis=-1, nan_policy="omit"),
+        )
+        # flox returns positions along the reduced dimension of the input
+        argmin = flox_xarray.xarray_reduce(
+            d, "week", func=aggs["nanargmin"], **kwargs
+        ).compute()
+        np.testing.assert_array_equal(
+            argmin.transpose("x", "week").values,
+            np.nanargmin(weeks, axis=-1) + 7 * np.arange(5),
+        )
+
+
+def test_ensemble_stats():
+    rng = np.random.default_rng(3)
+    da = xr.DataArray(rng.normal(size=(5, 11)), dims=["leadtime", "number"])
+    da[2:, 7:] = np.nan
+    da[0] = np.nan
+
+    res = ensemble_stats(da, stats=ENSEMBLE_STATS, q=[0.1, 0.9], ddof=1)
+    assert res.dims == ("leadtime", "stat")
+    xr.testing.assert_allclose(res.sel(stat="mean", drop=True), da.mean("number"))
+    xr.testing.assert_allclose(res.sel(stat="std", drop=True), da.std("number", ddof=1))
+    xr.testing.assert_allclose(res.sel(stat="min", drop=True), da.min("number"))
+    xr.testing.assert_allclose(res.sel(stat="max", drop=True), da.max("number"))
+    xr.testing.assert_allclose(res.sel(stat="median", drop=True), da.median("number"))
+    np.testing.assert_allclose(
+        res.sel(stat=["q0.1", "q0.9"]).values,
+        da.quantile([0.1, 0.9], dim="number").transpose().values,
+    )
+
+    # dask and Dataset input
+    res_dask = ensemble_stats(da.to_dataset(name="u").chunk(leadtime=2), q=[0.5])
+    xr.testing.assert_allclose(
+        res_dask.u.sel(stat="q0.5", drop=True).compute(), da.median("number")
+    )
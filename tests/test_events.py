@@ -1,7 +1,31 @@
 import pytest
+import numpy as np
+import pandas as pd
 import xarray as xr
 from s2stools.process import s2sparser
-from s2stools.events import EventComposite, find_ssw
+from s2stools.events import (
+    EventComposite,
+    EventTable,
+    EventStore,
+    find_ssw,
+    composite_streaming,
+    event_probability,
+    contingency,
+    _eventlist_to_dict,
+    prob_oneday_extreme_nam_within_period_clim,
+    bootstrap_extr_prob,
+    integrated_extr_prob,
+    exceedance_fractions,
+    extreme_predictors,
+    prob_oneday_extreme_nam_within_period_after_event,
+    ssw_onset,
+    detect,
+    _composite_from_eventlist,
+    _eventlist_from_json,
+    _events_split_reftime,
+    _eventdict_to_json,
+    _gathered_mean,
+)
 from tests.utils import *
 
 
@@ -18,8 +42,573 @@ def test_event_composite():
     ssw_composite2 = EventComposite(ds, ssws, descr="sudden warmings", model="ecmwf")
     assert isinstance(ssw_composite2.comp, xr.Dataset)
 
+    # events can be replaced as json event list
+    ssw_composite2.event_list_json = ssws[:10]
+    assert len(ssw_composite2) == 10
+    assert ssw_composite2.event_list_json == EventTable.from_list(ssws[:10]).to_list()
+    assert ssw_composite2.comp.sizes["i"] == 10
+
 
 def test_find_events():
     # sudden stratospheric warmings
     ds = xr.open_mfdataset(f"{DATA_PATH}/*.nc", preprocess=s2sparser)
     ssws = find_ssw(ds.u.mean("longitude").load())
+
+
+def test_composite_from_eventlist():
+    ds = xr.open_mfdataset(f"{DATA_PATH}/s2s*.nc", preprocess=s2sparser)
+    events = find_ssw(ds.u.mean("longitude").load())
+    comp = _composite_from_eventlist(events, ds)
+    assert comp.u.dims == ("i", "latitude", "longitude", "lagtime")
+    assert len(comp.i) == len(events)
+
+    # each event is the original forecast, shifted by its central day
+    for k in [0, len(events) // 2, len(events) - 1]:
+        e = comp.isel(i=k)
+        fc = ds.u.sel(
+            reftime=e.reftime.values, hc_year=e.hc_year.values, number=e.number.values
+        )
+        fc = fc.assign_coords(leadtime=fc.leadtime - e.leadtime.values)
+        xr.testing.assert_equal(
+            e.u.sel(lagtime=fc.leadtime.values).drop_vars(
+                ["lagtime", "validtime", "i", "leadtime"]
+            ),
+            fc.drop_vars(["leadtime", "validtime"]).rename(leadtime="lagtime"),
+        )
+
+
+def test_ssw_onset():
+    leadtime = pd.timedelta_range("0D", "46D", freq="1D")
+    u = np.full((3, 47), 20.0)
+    u[0, 20:25] = -5  # event at day 20, returns to westerlies
+    u[1, 30:] = -5  # event at day 30, final warming
+    u[2, 5:] = -5  # no westerly start
+    u60 = xr.DataArray(
+        u[:, None, None, :],
+        dims=["reftime", "hc_year", "number", "leadtime"],
+        coords=dict(
+            reftime=pd.to_datetime(["2000-01-01", "2000-01-05", "2000-01-09"]),
+            hc_year=[0],
+            number=[0],
+            leadtime=leadtime,
+        ),
+    )
+    onset = ssw_onset(u60)
+    assert onset.dims == u60.dims
+    np.testing.assert_array_equal(
+        onset.argmax("leadtime").squeeze().values, [20, 30, 0]
+    )
+    assert onset.sum().item() == 2
+
+    events = find_ssw(u60.chunk(reftime=1), require_return_westerly=10)
+    assert len(events) == 1
+    assert events[0]["fc"]["reftime"] == "2000-01-01"
+    assert pd.Timedelta(events[0]["leadtime"]) == pd.Timedelta("20D")
+
+
+def test_detect():
+    leadtime = pd.timedelta_range("0D", "46D", freq="1D")
+    x = np.zeros((2, 47))
+    x[0, 5:9] = -3  # 4 days
+    x[0, 11:13] = -4  # 2 days, 2 days after the first run
+    x[1, 20:21] = -5  # 1 day
+    data = xr.DataArray(
+        x[:, None, None, :],
+        dims=["reftime", "hc_year", "number", "leadtime"],
+        coords=dict(
+            reftime=pd.to_datetime(["2000-01-01", "2000-01-05"]),
+            hc_year=[0],
+            number=[0],
+            leadtime=leadtime,
+        ),
+    )
+
+    events = detect(data, lambda d: d < -2, peak="min")
+    assert [pd.Timedelta(e["leadtime"]).days for e in events] == [5, 11, 20]
+    assert [e["peak"] for e in events] == [-3, -4, -5]
+
+    # merge runs that are less than 3 days apart, require 2 days duration
+    events = detect(data, lambda d: d < -2, min_duration=2, separation=3, peak="min")
+    assert len(events) == 1
+    assert pd.Timedelta(events[0]["duration"]).days == 8
+    assert events[0]["peak"] == -4
+
+    # several thresholds in one pass
+    thresholds = xr.DataArray(
+        [-2, -3.5], dims="threshold", coords={"threshold": [-2, -3.5]}
+    )
+    events = detect(data, lambda d: d < thresholds, buffer_start=6)
+    assert sorted(
+        (e["threshold"], pd.Timedelta(e["leadtime"]).days) for e in events
+    ) == [
+        (-3.5, 11),
+        (-3.5, 20),
+        (-2, 11),
+        (-2, 20),
+    ]
+
+    # a single leadtime
+    single = detect(data.isel(leadtime=[20]), lambda d: d < -2)
+    assert len(single) == 1 and pd.Timedelta(single[0]["duration"]).days == 1
+
+    # can be used for compositing
+    comp = EventComposite(data.to_dataset(name="x"), events, descr="x", model="")
+    assert len(comp) == 4
+
+
+def test_event_table(tmp_path):
+    ds = xr.open_mfdataset(f"{DATA_PATH}/s2s*.nc", preprocess=s2sparser)
+    events = find_ssw(ds.u.mean("longitude").load())
+    table = EventTable.from_list(events)
+    assert len(table) == len(events)
+    assert table.leadtime.dtype == "timedelta64[ns]"
+    # lossless round trip to the json format
+    assert table.to_list() == events
+
+    # json files with days_since_init
+    from_json = EventTable.load(f"{DATA_PATH}/ssw*.json")
+    assert (
+        from_json.to_list()
+        == EventTable.from_list(
+            _eventlist_from_json(f"{DATA_PATH}/ssw*.json")
+        ).to_list()
+    )
+
+    for suffix in [".npz", ".json"]:
+        path = table.save(tmp_path / f"events{suffix}")
+        loaded = EventTable.load(path)
+        assert loaded.to_list() == events
+        xr.testing.assert_identical(
+            EventComposite(ds, str(path), descr="", model="").comp,
+            EventComposite(ds, events, descr="", model="").comp,
+        )
+
+    # split by reftime and write one file per reftime
+    splitted = _events_split_reftime(table)
+    assert [s["reftime"] for s in splitted] == [
+        s["reftime"] for s in _events_split_reftime(events)
+    ]
+    assert [s["events"].to_list() for s in splitted] == [
+        s["events"] for s in _events_split_reftime(events)
+    ]
+    _eventdict_to_json(table, str(tmp_path / "ssw.npz"), split_reftimes=True)
+    assert sorted(p.name for p in tmp_path.glob("ssw_ref*.npz")) == [
+        "ssw_ref20171116.npz",
+        "ssw_ref20171120.npz",
+    ]
+    assert len(EventTable.load(tmp_path / "ssw_ref*.npz")) == len(table)
+    with pytest.raises(FileNotFoundError):
+        EventTable.load(tmp_path / "typo*.npz")
+
+    # extra columns are carried along
+    detected = EventTable.from_list(
+        detect(ds.u.mean("longitude"), lambda x: x < 0, min_duration=3)
+    )
+    assert detected["duration"].dtype == "timedelta64[ns]"
+    assert detected[detected["peak"] < -10].to_list() == [
+        e for e in detected.to_list() if e["peak"] < -10
+    ]
+
+
+def test_event_store(tmp_path):
+    events = EventTable.load(f"{DATA_PATH}/ssw*.json")
+    store = EventStore.from_table(events)
+    assert len(store) == len(events)
+    assert (np.diff(store.reftime) >= np.timedelta64(0)).all()
+    assert [len(e) for _, e in store.groups()] == [
+        len(s["events"])
+        for s in sorted(
+            _events_split_reftime(events.to_list()), key=lambda s: s["reftime"]
+        )
+    ]
+
+    # queries give the same as list comprehensions over the event dicts
+    def days(e):
+        return pd.Timedelta(e["leadtime"]).days
+
+    selected = store.query(
+        reftime=slice("2017-11-17", None), hc_year=slice(-10, -5), leadtime=[20, 21]
+    )
+    expected = [
+        e
+        for e in store.to_list()
+        if e["fc"]["reftime"] >= "2017-11-17"
+        and -10 <= e["fc"]["hc_year"] <= -5
+        and days(e) in [20, 21]
+    ]
+    assert selected.to_list() == expected
+    assert len(store.query(months=[12, 1, 2])) == 0
+    assert len(store.query(months=11, reftime="2017-11-16")) == len(
+        store.query(reftime=slice(None, "2017-11-16"))
+    )
+
+    # set operations
+    early = store.query(leadtime=slice(None, 20))
+    late = store.query(leadtime=lambda lt: lt > np.timedelta64(20, "D"))
+    assert len(early.intersection(late)) == 0
+    assert store.difference(early).to_list() == late.to_list()
+    assert store.union(early).to_list() == store.to_list()
+    assert early.union(late).to_list() == store.to_list()
+    # match by forecast only
+    same_fc = early.intersection(late, on=["reftime", "hc_year", "number"])
+    fc_late = {
+        (e["fc"]["reftime"], e["fc"]["hc_year"], e["fc"]["number"])
+        for e in late.to_list()
+    }
+    assert all(
+        (e["fc"]["reftime"], e["fc"]["hc_year"], e["fc"]["number"]) in fc_late
+        for e in same_fc.to_list()
+    )
+
+    # one file per reftime
+    paths = store.save_split(tmp_path / "ssw.npz")
+    assert [p.name for p in paths] == ["ssw_ref20171116.npz", "ssw_ref20171120.npz"]
+    assert EventStore.load(tmp_path / "ssw_ref*.npz").to_list() == store.to_list()
+
+
+def test_event_composite_lazy_cache(tmp_path):
+    ds = xr.open_mfdataset(f"{DATA_PATH}/s2s*.nc", preprocess=s2sparser)
+    ds["v"] = ds.u * 2
+    events = EventTable.load(f"{DATA_PATH}/ssw*.json")
+    expected = _composite_from_eventlist(events, ds)
+
+    comp = EventComposite(ds, events, descr="", model="")
+    assert comp._comp == {}
+    xr.testing.assert_identical(comp["u"], expected.u)
+    assert list(comp._comp) == ["u"]
+    xr.testing.assert_identical(comp.comp, expected)
+    # built once, can be overridden
+    assert comp.comp is comp.comp
+    comp.comp = comp.comp.mean("i")
+    assert "i" not in comp.comp.dims and "i" not in comp["u"].dims
+
+    # variables without forecast dimensions are passed through
+    ds_static = ds.assign(
+        mask=ds.u.isel(reftime=0, hc_year=0, number=0, leadtime=0, drop=True) > 0,
+        u_ensmean=ds.u.mean("number"),
+    )
+    comp_static = EventComposite(ds_static, events, descr="", model="")
+    xr.testing.assert_identical(comp_static["mask"], ds_static.mask)
+    assert comp_static["u_ensmean"].dims == ("i", "latitude", "longitude", "lagtime")
+    xr.testing.assert_identical(comp_static["u"], expected.u)
+
+    cached = EventComposite(ds, events, descr="", model="", cache_dir=tmp_path)
+    xr.testing.assert_allclose(cached["u"], expected.u)
+    assert len(list(tmp_path.glob("u_*.nc"))) == 1
+    assert len(list(tmp_path.glob("v_*.nc"))) == 0
+    # same events and data: loaded from the cache
+    again = EventComposite(ds, events, descr="", model="", cache_dir=tmp_path)
+    assert again["u"].encoding["source"] == cached["u"].encoding["source"]
+    # other events: new cache entry
+    EventComposite(ds, events[:10], descr="", model="", cache_dir=tmp_path)["u"]
+    assert len(list(tmp_path.glob("u_*.nc"))) == 2
+
+
+def test_composite_streaming(tmp_path):
+    ds = xr.open_mfdataset(f"{DATA_PATH}/s2s*.nc", preprocess=s2sparser)
+    events = EventTable.load(f"{DATA_PATH}/ssw*.json")
+    expected = _composite_from_eventlist(events, ds).compute()
+
+    xr.testing.assert_identical(composite_streaming(events, ds, n_workers=2), expected)
+    on_disk = composite_streaming(events, ds, out_dir=tmp_path)
+    assert (tmp_path / "u.npy").exists()
+    xr.testing.assert_identical(on_disk, expected)
+    comp = EventComposite(ds, events, descr="", model="", n_workers=2)
+    xr.testing.assert_identical(comp["u"], expected.u)
+
+
+def _dummy_nam(seed=0):
+    rng = np.random.default_rng(seed)
+    nam = xr.DataArray(
+        rng.normal(size=(4, 3, 10, 46)),
+        dims=["reftime", "hc_year", "number", "days_since_init"],
+        coords=dict(
+            reftime=pd.date_range("2000-01-01", periods=4),
+            hc_year=[-3, -2, -1],
+            number=np.arange(10),
+            days_since_init=np.arange(46),
+        ),
+    )
+    nam[0, 0] = np.nan
+    return nam
+
+
+def test_prob_oneday_extreme_nam_within_period_clim():
+    nam = _dummy_nam()
+    res = prob_oneday_extreme_nam_within_period_clim(
+        nam, -2, bootstrap_sample_size=50, n_bootstrap_samples=2_000, seed=1
+    )
+    assert res.sizes["days"] == 46
+    pop = nam.stack(fc=("reftime", "hc_year", "number")).dropna("fc", how="all")
+    for pl in [0, 5, 20]:
+        exact = (
+            (pop.sel(days_since_init=slice(10, 10 + pl)) < -2)
+            .any("days_since_init")
+            .mean()
+        )
+        np.testing.assert_allclose(res.sel(stat="mean", days=pl + 1), exact, atol=0.01)
+    assert (res.sel(stat="uncertainty_bottom") <= res.sel(stat="mean")).all()
+    assert (res.sel(stat="uncertainty_top") >= res.sel(stat="mean")).all()
+    assert (res.sel(stat="mean").diff("days") >= 0).all()
+    xr.testing.assert_identical(
+        res,
+        prob_oneday_extreme_nam_within_period_clim(
+            nam,
+            -2,
+            bootstrap_sample_size=50,
+            n_bootstrap_samples=2_000,
+            seed=1,
+            n_workers=2,
+        ),
+    )
+
+    # same replicates and confidence interval as bootstrap_extr_prob
+    mean, ci = bootstrap_extr_prob(
+        pop, 50, slice(10, 15), -2, n_bootstrap_samples=2_000, seed=1
+    )
+    np.testing.assert_allclose(
+        res.sel(days=6, stat=["mean", "uncertainty_bottom", "uncertainty_top"]),
+        [mean, *ci],
+    )
+
+
+def test_bootstrap_extr_prob():
+    pop = _dummy_nam().stack(fc=("reftime", "hc_year", "number"))
+    pop = pop.dropna("fc", how="all")
+    kwargs = dict(
+        population=pop,
+        sample_size=50,
+        dsi_slice=slice(10, 15),
+        threshold=-2,
+        n_bootstrap_samples=2_500,
+        seed=3,
+        batch_size=1_000,
+    )
+    mean, ci = bootstrap_extr_prob(**kwargs)
+    exact = (pop.sel(days_since_init=slice(10, 15)) < -2).any("days_since_init").mean()
+    np.testing.assert_allclose(mean, exact, atol=0.01)
+    assert ci[0] < mean < ci[1]
+
+    # reproducible, independent of the pool
+    assert bootstrap_extr_prob(**kwargs) == (mean, ci)
+    assert bootstrap_extr_prob(**kwargs, n_workers=2) == (mean, ci)
+    assert bootstrap_extr_prob(**kwargs, n_workers=2, executor="process") == (
+        mean,
+        ci,
+    )
+
+
+def _integrated_extr_prob_loop(data, dse_slice, threshold):
+    # day-by-day reference: exclude members that were already extreme
+    p, excluded = [], set()
+    for dse in data.sel(days_since_event=dse_slice).days_since_event.values:
+        day = data.sel(days_since_event=dse)
+        extreme = day < threshold if threshold <= 0 else day > threshold
+        extr = set(day.i.values[extreme.values])
+        at_risk = day.notnull().values & ~np.isin(day.i.values, list(excluded))
+        p.append(len(extr - excluded) / at_risk.sum() if at_risk.sum() else 0)
+        excluded |= extr
+    return 1 - np.prod(1 - np.array(p))
+
+
+def test_integrated_extr_prob():
+    rng = np.random.default_rng(4)
+    comp = xr.DataArray(
+        rng.normal(size=(30, 60)),
+        dims=["days_since_event", "i"],
+        coords=dict(days_since_event=np.arange(-5, 25), i=np.arange(60)),
+    )
+    comp[10:, :5] = np.nan  # members that end early
+    for threshold in [-1.5, 2]:
+        p = prob_oneday_extreme_nam_within_period_after_event(comp, threshold)
+        assert p.days.values.tolist() == list(range(1, 25))
+        expected = [
+            _integrated_extr_prob_loop(comp, slice(1, 1 + i), threshold)
+            for i in range(24)
+        ]
+        np.testing.assert_allclose(p.values, expected)
+        np.testing.assert_allclose(
+            integrated_extr_prob(comp, slice(3, 8), threshold),
+            _integrated_extr_prob_loop(comp, slice(3, 8), threshold),
+        )
+
+
+def test_exceedance_fractions():
+    rng = np.random.default_rng(5)
+    comp = xr.Dataset(
+        {
+            "nam1000": (("days_since_event", "i"), 3 * rng.normal(size=(30, 60))),
+            "nam100": (("days_since_event", "i"), 3 * rng.normal(size=(30, 60))),
+        },
+        coords=dict(days_since_event=np.arange(-5, 25), i=np.arange(60)),
+    )
+    comp["nam1000"][10:, :5] = np.nan
+
+    thresholds = [("<", -3), ("<", 0), (">", 3)]
+    fractions = exceedance_fractions(comp.chunk(i=20), thresholds)
+    assert fractions.nam1000.chunks is not None  # lazy
+    assert fractions.threshold.values.tolist() == ["<-3", "<0", ">3"]
+    valid = comp.notnull().sum("i")
+    xr.testing.assert_allclose(
+        fractions.sel(threshold=">3", drop=True).compute(),
+        (comp > 3).sum("i") / valid,
+    )
+    xr.testing.assert_allclose(
+        fractions.nam100.sel(threshold="<-3", drop=True).compute(),
+        (comp.nam100 < -3).sum("i") / valid.nam100,
+    )
+
+    predictors = extreme_predictors(comp)
+    xr.testing.assert_allclose(
+        predictors.extremors_nam1000_m0, (comp.nam1000 < 0).sum("i") / valid.nam1000
+    )
+    with pytest.raises(ValueError):
+        exceedance_fractions(comp, [("<=", 0)])
+
+
+def test_event_composite_significance():
+    rng = np.random.default_rng(6)
+    data = xr.DataArray(
+        rng.normal(size=(4, 5, 10, 3, 30)),
+        dims=["reftime", "hc_year", "number", "latitude", "leadtime"],
+        coords=dict(
+            reftime=pd.to_datetime(
+                ["2000-01-01", "2000-01-15", "2000-02-01", "2000-02-15"]
+            ),
+            hc_year=np.arange(-5, 0),
+            number=np.arange(10),
+            latitude=[50, 60, 70],
+            leadtime=pd.timedelta_range("0D", periods=30, freq="D"),
+        ),
+    )
+    # strong signal at the central day of the events, at latitude 60
+    fc = [(r, h, 0) for r in range(4) for h in range(5)]
+    central = rng.integers(5, 25, size=len(fc))
+    for (r, h, n), c in zip(fc, central):
+        data[r, h, n, 1, c] += 5
+    events = EventTable(
+        reftime=data.reftime.values[[r for r, _, _ in fc]],
+        hc_year=data.hc_year.values[[h for _, h, _ in fc]],
+        number=np.zeros(len(fc)),
+        leadtime=data.leadtime.values[central],
+    )
+    comp = EventComposite(data.to_dataset(name="x"), events, descr="", model="")
+
+    sig = comp.significance("x", n_samples=400, seed=0, batch_size=64)
+    assert sig.p_value.dims == comp["x"].dims[1:]
+    xr.testing.assert_allclose(sig["mean"], comp["x"].mean("i").astype(float))
+    assert sig.p_value.sel(lagtime="0D", latitude=60) < 0.01
+    assert sig.p_value.sel(lagtime="0D", latitude=[50, 70]).min() > 0.01
+    assert ((sig.p_value > 0) & (sig.p_value <= 1)).all()
+
+    # reproducible, independent of the number of workers
+    xr.testing.assert_identical(
+        sig, comp.significance("x", n_samples=400, seed=0, batch_size=64, n_workers=3)
+    )
+    # dask data is read one reftime at a time
+    comp_dask = EventComposite(
+        data.to_dataset(name="x").chunk(reftime=1), events, descr="", model=""
+    )
+    xr.testing.assert_allclose(
+        sig, comp_dask.significance("x", n_samples=400, seed=0, batch_size=64)
+    )
+
+
+def test_gathered_mean():
+    rng = np.random.default_rng(7)
+    values = rng.normal(size=(3, 4, 2, 5, 12))
+    values[values > 1.5] = np.nan
+    da = xr.DataArray(values, dims=["reftime", "hc_year", "number", "x", "leadtime"])
+    pad = 3
+    positions = rng.integers(0, 12, size=(9, 1)) + np.arange(5)
+    # sets of the same size, with forecasts repeated within and across sets
+    fc = rng.integers(0, 3 * 4 * 2, size=(6, 9))
+    fc[:, 0] = fc[:, 1]
+
+    padded = np.pad(values, [(0, 0)] * 4 + [(pad, pad)], constant_values=np.nan)
+    flat = padded.reshape(3 * 4 * 2, 5, -1)
+    expected = [
+        np.nanmean([flat[f][:, p].T for f, p in zip(fcs, positions)], axis=0)
+        for fcs in fc
+    ]
+    np.testing.assert_allclose(_gathered_mean(da, fc, positions, pad), expected)
+
+
+def test_event_probability():
+    ds = xr.open_mfdataset(f"{DATA_PATH}/s2s*.nc", preprocess=s2sparser)
+    u60 = ds.u.mean("longitude").squeeze()
+    p = event_probability(u60)
+    assert "number" not in p.dims
+    assert "validtime" in p.coords
+    p = p.compute()
+    assert (p.diff("leadtime") >= 0).all()
+
+    # tally of the event list of find_ssw
+    events = EventTable.from_list(find_ssw(u60.load()))
+    n_valid = u60.notnull().any("leadtime").sum("number")
+    for reftime, hc_year, lt in [("2017-11-16", -2, "30D"), ("2017-11-20", -15, "46D")]:
+        n_events = (
+            (events.reftime == np.datetime64(reftime))
+            & (events.hc_year == hc_year)
+            & (events.leadtime <= pd.Timedelta(lt).to_timedelta64())
+        ).sum()
+        np.testing.assert_allclose(
+            p.sel(reftime=reftime, hc_year=hc_year, leadtime=lt),
+            n_events / n_valid.sel(reftime=reftime, hc_year=hc_year),
+        )
+
+
+def test_contingency():
+    forecasts = xr.DataArray(
+        np.zeros((2, 2, 3, 30)),
+        dims=["reftime", "hc_year", "number", "leadtime"],
+        coords=dict(
+            reftime=pd.to_datetime(["2000-01-01", "2000-01-15"]),
+            hc_year=[-1, 0],
+            number=[0, 1, 2],
+            leadtime=pd.timedelta_range("0D", periods=30, freq="D"),
+        ),
+    )
+    events = _eventlist_to_dict(
+        [
+            [(pd.Timestamp("2000-01-01"), 0, 0), pd.Timedelta("9D")],  # hit
+            [(pd.Timestamp("2000-01-01"), 0, 1), pd.Timedelta("12D")],  # hit
+            [(pd.Timestamp("2000-01-01"), -1, 2), pd.Timedelta("3D")],  # false alarm
+            [(pd.Timestamp("2000-01-15"), -1, 0), pd.Timedelta("5D")],  # hit
+            [(pd.Timestamp("2000-01-15"), -1, 1), pd.Timedelta("15D")],  # false alarm
+        ]
+    )
+    observed = ["2000-01-10", "1999-01-20"]
+
+    scores = contingency(
+        events, observed, forecasts=forecasts, leadtime_bins=[0, 7, 14, 21]
+    )
+    assert scores.hits.values.tolist() == [1, 2, 0]
+    assert scores.misses.values.tolist() == [2, 1, 3]
+    assert scores.false_alarms.values.tolist() == [1, 0, 1]
+    assert int(scores.correct_negatives.sum()) == 36 - 3 - 6 - 2
+    np.testing.assert_allclose(scores.pod, [1 / 3, 2 / 3, 0])
+    np.testing.assert_allclose(scores.far.values[:2], [0.5, 0])
+    np.testing.assert_allclose(scores.brier.sel(leadtime_bin="7-14D"), 1 / 9 / 4)
+
+    total = contingency(events, observed, forecasts=forecasts, by=[])
+    assert int(total.hits) == 3
+    # a timing tolerance can only add observed events
+    tolerant = contingency(events, observed, tolerance_days=5, forecasts=forecasts)
+    assert (
+        tolerant.hits >= contingency(events, observed, forecasts=forecasts).hits
+    ).all()
+
+    # a single realtime forecast, one reftime and hc_year
+    single = contingency(
+        _eventlist_to_dict([[(pd.Timestamp("2000-01-01"), 0, 0), pd.Timedelta("9D")]]),
+        ["2000-01-10"],
+    )
+    assert single.hits.values.tolist() == [0, 1, 0, 0, 0, 0, 0]
+    assert int(single.misses.sum() + single.false_alarms.sum()) == 0
+    # hindcasts of a leap day
+    leap = contingency(
+        _eventlist_to_dict([[(pd.Timestamp("2000-02-29"), -1, 0), pd.Timedelta("3D")]]),
+        ["1999-03-03"],
+    )
+    assert int(leap.hits.sum()) == 1
@@ -1,4 +1,28 @@
-from s2stools.indices import download_mjo, download_indices, download_enso, download_qbo
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from s2stools import cache
+from s2stools.indices import (
+    ENSO_URL,
+    NAO_URL,
+    QBO_URL,
+    _load_u60,
+    _parse_enso,
+    _parse_nao,
+    _parse_qbo,
+    download_mjo,
+    download_indices,
+    download_qbo,
+    eofs,
+    load_u60_10hpa,
+    project,
+)
+from tests.utils import DATA_PATH, MIRROR_PATH
 
 
 def test_download_mjo():
@@ -6,9 +30,216 @@ def test_download_mjo():
 
 
 def test_download_indices():
-    download_indices()
+    ds = download_indices()
+    if "failed_sources" in ds.attrs:
+        pytest.skip(f"download of {ds.attrs['failed_sources']} failed, no network?")
+    assert {"enso", "mjo_phase", "mjo_mag", "u"} <= set(ds.data_vars)
 
 
 def test_download_qbo():
     result = download_qbo()
     print(result)
+
+
+def _mirrored(url):
+    with open(f"{MIRROR_PATH}/{url.split('://')[1]}", "rb") as f:
+        return f.read()
+
+
+def _parse_enso_pandas(content):
+    df = pd.read_table(
+        io.BytesIO(content),
+        skiprows=1,
+        sep=r"\s+",
+        names=["year"] + list(np.arange(1, 13)),
+        skipfooter=7,
+        engine="python",
+        na_values=-99.99,
+    )
+    df2 = df.melt(var_name="month", value_name="enso", id_vars="year")
+    df2["time"] = pd.to_datetime(
+        df2["year"].astype(str) + "-" + df2["month"].astype("str")
+    )
+    df2.set_index("time", inplace=True)
+    df2.drop(columns=["year", "month"], inplace=True)
+    df2.sort_index(inplace=True)
+    return df2.squeeze().to_xarray()
+
+
+def _parse_qbo_pandas(content):
+    qbo = pd.read_table(
+        io.BytesIO(content),
+        skiprows=381,
+        sep=r"\s+",
+        index_col=0,
+        usecols=range(1, 9),
+        names=["IIIII", "time"] + [f"{p}hPa" for p in [70, 50, 40, 30, 20, 15, 10]],
+        date_format="%y%m",
+        parse_dates=[0],
+    )
+    qbo_xr = qbo.to_xarray().to_array("p")
+    data = (
+        (qbo_xr / 10)
+        .assign_coords(p=[int(str(p[:-3])) for p in qbo_xr.p.values])
+        .rename("u")
+        .assign_attrs(units="m/s")
+    )
+    data["p"] = data.p.assign_attrs(units="hPa", long_name="pressure level")
+    return data
+
+
+def _parse_nao_pandas(content):
+    nao_index = pd.read_table(
+        io.BytesIO(content), names=["year", "month", "day", "nao"], sep=r"\s+"
+    )
+    nao_index = nao_index[~np.isnan(nao_index.nao)]
+    nao_index["time"] = pd.to_datetime(nao_index[["year", "month", "day"]])
+    nao_index = nao_index.drop(columns=["year", "month", "day"])
+    return nao_index.set_index("time").to_xarray()
+
+
+def test_parsers():
+    # numpy parsers give the same result as the previous pandas implementation
+    for url, parse, parse_pandas in [
+        (ENSO_URL, _parse_enso, _parse_enso_pandas),
+        (QBO_URL, _parse_qbo, _parse_qbo_pandas),
+        (NAO_URL, _parse_nao, _parse_nao_pandas),
+    ]:
+        content = _mirrored(url)
+        xr.testing.assert_identical(parse(content), parse_pandas(content))
+
+    # rows with missing values are dropped
+    content = _mirrored(NAO_URL) + b"2020  3  1\n"
+    xr.testing.assert_identical(_parse_nao(content), _parse_nao_pandas(content))
+
+
+def _dummy_anoms_eofs(seed=0):
+    rng = np.random.default_rng(seed)
+    anoms = xr.DataArray(
+        rng.normal(size=(2, 3, 4, 5, 6, 8)),
+        dims=["reftime", "hc_year", "number", "leadtime", "latitude", "longitude"],
+        coords=dict(latitude=np.linspace(30, 90, 6), longitude=np.arange(0, 360, 45)),
+    )
+    anoms = anoms.assign_coords(
+        validtime=(("reftime", "leadtime"), np.arange(10).reshape(2, 5))
+    )
+    eofs = xr.DataArray(
+        rng.normal(size=(3, 6, 8)),
+        dims=["mode", "latitude", "longitude"],
+        coords=dict(mode=[0, 1, 2], latitude=anoms.latitude),
+    )
+    return anoms, eofs
+
+
+def test_project():
+    anoms, eofs = _dummy_anoms_eofs()
+    weights = np.cos(np.deg2rad(anoms.latitude)).where(anoms.latitude < 90, 0)
+    expected = xr.dot(anoms, eofs * weights, dim=["latitude", "longitude"])
+
+    pc = project(anoms, eofs)
+    assert pc.dims == ("reftime", "hc_year", "number", "leadtime", "mode")
+    assert "validtime" in pc.coords
+    xr.testing.assert_allclose(pc, expected.transpose(*pc.dims).rename("pc"))
+
+    # blockwise on dask, also with chunked spatial dimensions
+    pc_dask = project(anoms.chunk(number=2, latitude=3), eofs)
+    xr.testing.assert_allclose(pc_dask.compute(), pc)
+
+    # normalization and no weights
+    norm = xr.DataArray([1.0, 2.0, 4.0], dims="mode")
+    pc_norm = project(anoms, eofs, weights=None, normalization=norm)
+    expected = xr.dot(anoms, eofs, dim=["latitude", "longitude"]) / norm
+    xr.testing.assert_allclose(pc_norm, expected.transpose(*pc.dims).rename("pc"))
+
+    # multivariate eofs as Dataset, gridpoints missing in the eofs are ignored
+    anoms2, eofs2 = _dummy_anoms_eofs(seed=1)
+    eofs2[:, 0] = np.nan
+    anoms2[..., 0, :] = np.nan
+    pc_multi = project(
+        xr.Dataset(dict(a=anoms, b=anoms2)), xr.Dataset(dict(a=eofs, b=eofs2))
+    )
+    xr.testing.assert_allclose(
+        pc_multi, pc + project(anoms2.isel(latitude=slice(1, None)), eofs2[:, 1:])
+    )
+
+
+def test_eofs():
+    # three modes with decreasing variance plus noise, pole gridpoints have zero weight
+    rng = np.random.default_rng(2)
+    patterns = rng.normal(size=(3, 7, 8))
+    pcs = rng.normal(size=(300, 3)) * [5, 3, 2]
+    data = xr.DataArray(
+        np.einsum("tk,kij->tij", pcs, patterns) + rng.normal(size=(300, 7, 8)),
+        dims=["time", "latitude", "longitude"],
+        coords=dict(latitude=np.linspace(0, 90, 7)),
+    )
+    data[:, :, 0] = np.nan
+
+    exact = eofs(data, n_modes=3)
+    weights = np.cos(np.deg2rad(data.latitude)).where(data.latitude < 90, 0)
+    matrix = (data * np.sqrt(weights)).fillna(0).values.reshape(300, -1)
+    sv = np.linalg.svd(matrix, compute_uv=False)
+    np.testing.assert_allclose(exact.variance_fraction, sv[:3] ** 2 / (sv**2).sum())
+    assert exact.eofs.isel(latitude=-1).isnull().all()
+    assert exact.eofs.isel(longitude=0).isnull().all()
+    xr.testing.assert_allclose(exact.pcs, project(data.fillna(0), exact.eofs))
+
+    # randomized SVD chunk by chunk along the samples
+    approx = eofs(data.chunk(time=50), n_modes=3, seed=0)
+    xr.testing.assert_allclose(approx.eofs, exact.eofs, atol=1e-6)
+    xr.testing.assert_allclose(approx.variance_fraction, exact.variance_fraction)
+    xr.testing.assert_allclose(approx.pcs.compute(), exact.pcs, atol=1e-4)
+
+    # several sample dimensions
+    stacked = eofs(
+        data.assign_coords(time=np.arange(300))
+        .coarsen(time=30)
+        .construct(time=("hc_year", "leadtime")),
+        n_modes=2,
+    )
+    assert stacked.pcs.dims == ("hc_year", "leadtime", "mode")
+    xr.testing.assert_allclose(stacked.eofs, exact.eofs.isel(mode=slice(2)))
+
+
+def test_load_u60_10hpa(tmp_path):
+    era5 = xr.open_dataset(f"{DATA_PATH}era5_u_10hpa_60n_short.nc")
+    expected = era5.u.sel(latitude=60).mean("longitude").drop_vars("latitude")
+    era5.isel(time=slice(15)).to_netcdf(tmp_path / "u_1.nc")
+    era5.isel(time=slice(15, None)).to_netcdf(tmp_path / "u_2.nc")
+
+    with cache.set_options(cache_dir=str(tmp_path / "cache")):
+        _load_u60.cache_clear()
+        u60 = load_u60_10hpa(str(tmp_path / "u_*.nc"))
+        np.testing.assert_allclose(u60, expected)
+        assert u60.name == "u60" and u60.dims == ("time",)
+        assert len(list((tmp_path / "cache").glob("u60_*.nc"))) == 1
+
+        # repeated calls come from memory, then from disk
+        load_u60_10hpa(str(tmp_path / "u_*.nc"))
+        assert _load_u60.cache_info().hits == 1
+        _load_u60.cache_clear()
+        xr.testing.assert_identical(load_u60_10hpa(str(tmp_path / "u_*.nc")), u60)
+
+        ds = download_indices(
+            enso=False,
+            mjo=False,
+            qbo=False,
+            u60=True,
+            era5_path=str(tmp_path / "u_*.nc"),
+        )
+        xr.testing.assert_identical(ds.u60, u60)
+
+        # rewriting an ERA5 file invalidates the cached indices
+        (era5.isel(time=slice(15, None)) + 1).to_netcdf(tmp_path / "u_2.nc")
+        os.utime(tmp_path / "u_2.nc", (0, os.path.getmtime(tmp_path / "u_1.nc") + 10))
+        ds = download_indices(
+            enso=False,
+            mjo=False,
+            qbo=False,
+            u60=True,
+            era5_path=str(tmp_path / "u_*.nc"),
+        )
+        np.testing.assert_allclose(ds.u60[15:], u60[15:] + 1)
+
+    with pytest.raises(ValueError):
+        download_indices(u60=True)
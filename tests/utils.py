@@ -1,4 +1,5 @@
 DATA_PATH = "tests/data/"
+MIRROR_PATH = f"{DATA_PATH}/mirror"
 
 
 def test_pre_commit():